@@ -9,7 +9,8 @@ FILTROS: Elimina productos con estados específicos como "reprogramado por el co
 DESCARGA DE IMÁGENES ARREGLADA: Múltiples estrategias para descargar imágenes exitosamente
 
 Requisitos:
-    pip install beautifulsoup4 reportlab requests pillow
+    pip install beautifulsoup4 lxml reportlab requests pillow
+    (opcional) pip install orjson  -> guardado del JSON más rápido
 """
 
 import json
@@ -18,43 +19,53 @@ import os
 import sys
 import logging
 import argparse
+import subprocess
+from collections import Counter
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 import threading
 import tempfile
 import time
 from urllib.parse import urlparse, parse_qs
-from reportlab.lib.units import inch
 from typing import Dict, List, Optional, Any, Tuple
 
 
 
-# GUI
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+# GUI y automatización con teclas: se importan recién al abrir la interfaz (load_gui_modules),
+# así el modo CLI (--html) no paga la carga de tkinter/pyautogui/keyboard
+tk = filedialog = messagebox = ttk = None
+pyautogui = keyboard = None
 
 # HTML
-from bs4 import BeautifulSoup
-
-# PDF
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm
-from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Paragraph,
-    Spacer, PageBreak, Image as RLImage
-)
-from reportlab.lib.enums import TA_CENTER
-
-# HTTP
-import requests
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
+try:
+    import lxml  # noqa: F401 - parser en C, bastante más rápido que html.parser
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Solo se construye el árbol de las tarjetas de pedido (incluye sus <script> internos)
+ORDER_CARD_STRAINER = SoupStrainer(class_=re.compile('row-card-container'))
+# Tags que el extractor nunca lee y se descartan del árbol tras parsear
+NON_CONTENT_TAGS = ['style', 'link']
+
+# JSON: orjson (en C/Rust) si está instalado; mismo formato que json.dumps(indent=2, ensure_ascii=False)
+try:
+    import orjson
+
+    def dumps_json(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def dumps_json(data):
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+# PDF (reportlab, Pillow) y HTTP (requests): los importa PDFGenerator al crearse,
+# así cargar el módulo y extraer no paga su costo
 
 # AUTOMATIZACIÓN CON TECLAS
-import pyautogui
 import threading
 import time
-import keyboard
 
 # -------- LOGGING -------- #
 # Configuración temporal del logging (se reconfigurará después)
@@ -67,7 +78,151 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-_IMAGE_CACHE = {}  # cache imágenes
+# -------- REGEX PRECOMPILADAS -------- #
+# Se compilan una sola vez al importar; el extractor las usa por cada contenedor.
+RE_PRODUCT_ROW = re.compile('sc-product-row')
+RE_PRODUCT_ROW_TESTID = re.compile('product-row')
+RE_ROW_CARD = re.compile('row-card-container')
+RE_SC_ROW = re.compile('sc-row')
+RE_STATUS_ACTION = re.compile('sc-status-action-row__status')
+RE_PRODUCT_CLASS = re.compile('product', re.I)
+RE_PRICE_TEXT = re.compile(r'\$\s*\d+')
+RE_STATUS_KEYWORDS = re.compile(r'reprogramado|cancelado|devuelto|reembolsado|demorado|acuerdas|acuerda|acordar', re.I)
+RE_STATUS_CLASS = re.compile('status')
+RE_JSON_STATUS = re.compile(r'"status"\s*:\s*"([^"]*)"', re.I)
+RE_JSON_FILTER_WORDS = re.compile(r'cancelad|devuelt|reembolsad')
+RE_DIAG_FILTER_WORDS = re.compile(r'reprogramado|cancelad|devuelt|reembolsad|acordar|acuerda', re.I)
+
+# Estados que indican que el producto ya fue entregado (no los que están en camino)
+RE_DELIVERED = re.compile('|'.join(re.escape(term) for term in (
+    'entregado al conductor',
+    'entregado',
+    'fue entregado',
+    'ya fue entregado',
+    'producto entregado',
+    'pedido entregado',
+    'envío entregado',
+    'entrega completada',
+    'entrega finalizada',
+)))
+
+# Unión de todas las variantes de estado de ML que filtran (incluye entregados)
+RE_ML_FILTER_HINTS = re.compile(
+    r'cancelad|cancelaste|comprador cancel|devuelt|reembolsad|reclam|mediaci|problema|pendiente|'
+    + RE_DELIVERED.pattern)
+
+# Patrones de estados temporales ("a acordar"), en orden de prioridad
+TEMPORAL_PATTERNS = tuple(re.compile(p, re.I) for p in (
+    r'acuerdas?\s+la\s+entrega',
+    r'acuerdo\s+la\s+entrega',
+    r'a\s+acordar\s+con\s+el\s+comprador',
+    r'contacta[rt]?e?\s+con\s+tu\s+comprador',
+    r'avisar\s+entrega',
+))
+# Alternancia de todos los anteriores, un grupo por patrón (match.lastindex - 1 = prioridad):
+# una sola pasada encuentra el estado temporal. Los patrones no pueden solaparse entre sí.
+RE_TEMPORAL_ANY = re.compile('|'.join(f'({p.pattern})' for p in TEMPORAL_PATTERNS), re.I)
+
+# Palabras clave de estado dentro de JSON embebido en el HTML, en orden de prioridad
+JSON_STATUS_KEYWORDS = (
+    'acuerd',
+    'acordar',
+    'reprogramado',
+    'cancelad',     # "cancelado" y "cancelada"
+    'devuelt',      # "devuelto" y "devuelta"
+    'reembolsad',   # "reembolsado" y "reembolsada"
+    'demorado',
+)
+RE_JSON_STATUS_ANY = re.compile(
+    r'"status"\s*:\s*"([^"]*(?:' + '|'.join(JSON_STATUS_KEYWORDS) + r')[^"]*)"', re.I)
+
+# Fechas de ML: "21 jul", "21 jul 2024", "21 jul 14:30", "21 jul 2024 14:30"
+RE_DATE_TEXT = re.compile(r'\d{1,2}\s+(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)', re.I)
+RE_DATE_IN_TEXT = re.compile(r'(\d{1,2}\s+(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)(?:\s+\d{4})?(?:\s+\d{1,2}:\d{2})?)', re.I)
+MONTH_MAP = {
+    'ene': 1, 'feb': 2, 'mar': 3, 'abr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'ago': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dic': 12
+}
+# Fechas que cuenta el diagnóstico cuando no se encuentran contenedores: "21 jul" con año u hora opcionales
+RE_DIAG_DATE = re.compile(
+    r'\d{1,2}\s+(?:ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)'
+    r'(?:\s+(?P<year>\d{4})|\s+(?P<time>\d{1,2}:\d{2}))?', re.I)
+RE_ML_DATE = re.compile(r'(\d{1,2})\s+(\w{3})(?:\s+(\d{4}))?(?:\s+(\d{1,2}):(\d{2}))?', re.I)
+
+# ID de pedido
+ORDER_ID_PATTERNS = tuple(re.compile(p, re.I) for p in (
+    r'#(\d+)',
+    r'pack_id["\']?\s*:\s*["\']?(\d+)',
+    r'order[_-]?id["\']?\s*:\s*["\']?(\d+)',
+))
+RE_ORDER_ID_CLASS = re.compile('pack.id|order.id|left-column__pack-id')
+RE_LONG_NUMBER = re.compile(r'(\d{10,})')
+
+# Links, imágenes y números
+RE_ARTICLE_LINK = re.compile(r'articulo\.mercadolibre')
+RE_HTTP_URL = re.compile(r'^https?://', re.I)
+RE_MLSTATIC_IMG = re.compile(r'mlstatic.*\.(jpg|jpeg|png|webp)', re.I)
+RE_MLSTATIC = re.compile('mlstatic')
+RE_BACKGROUND_IMAGE = re.compile('background-image', re.I)
+RE_CSS_URL = re.compile(r'url\(([^)]+)\)')
+RE_IMG_LARGE = re.compile(r'-I\.jpg')
+RE_IMG_ORIGINAL = re.compile(r'-O\.jpg')
+RE_ML_IMG_NORMALIZE = re.compile(r'-O\.(?:jpg|webp)|\.webp')
+RE_NUMBER = re.compile(r'(\d+)')
+
+# Método de extracción de cada campo, para el reporte detallado
+EXTRACTION_METHOD_NAMES = {
+    'nombre': "extract_product_name -> label class or longest text",
+    'link': "extract_product_link -> redirect-row href or articulo.mercadolibre",
+    'imagen': "extract_product_image -> sc-product-picture img src",
+    'precio': "extract_price -> price-container or $ pattern",
+    'cantidad': "extract_quantity -> unit class or 'unidad' text",
+    'sku': "extract_sku -> sku class or 'SKU:' text",
+}
+
+# Texto del reporte para los detalles que solo se calculan con --debug
+DEBUG_DISABLED_NOTE = 'no calculado (ejecutar con --debug)'
+
+
+@lru_cache(maxsize=32)
+def _states_regex(states):
+    """Alternancia case-insensitive (cacheada) para una tupla de estados/palabras clave"""
+    if not states:
+        return re.compile(r'(?!)')  # lista vacía: nunca matchea
+    return re.compile('|'.join(re.escape(state) for state in states), re.I)
+
+
+def _intern_short(value):
+    """Interna textos cortos que se repiten entre pedidos (cantidad, precio, SKU, estado)"""
+    if isinstance(value, str) and len(value) < 128:
+        return sys.intern(value)
+    return value
+
+
+@lru_cache(maxsize=32)
+def _lowered_states(states):
+    """Pares (estado, estado en minúsculas) de una tupla de estados, calculados una sola vez"""
+    return tuple((state, state.lower()) for state in states)
+
+
+@lru_cache(maxsize=None)
+def _class_word_pattern(value):
+    """Regex (cacheada por valor) que matchea una clase como palabra dentro del atributo"""
+    return re.compile(rf".*\b{re.escape(value)}\b.*")
+
+
+@lru_cache(maxsize=1024)
+def _ml_date_components(date_text):
+    """
+    (día, mes_texto, año|None, hora, minuto) de una fecha de ML, o None si no matchea.
+    Cacheado por texto: en un listado muchos pedidos comparten la misma fecha.
+    """
+    match = RE_ML_DATE.search(date_text)
+    if not match:
+        return None
+    day, month_text, year, hour, minute = match.groups()
+    return (int(day), month_text.lower(), int(year) if year else None,
+            int(hour) if hour else 0, int(minute) if minute else 0)
 
 
 def get_cache_directory():
@@ -144,18 +299,41 @@ def get_desktop_directory():
     logging.warning(f"⚠️ Usando directorio de fallback para escritorio: {fallback_dir}")
     return fallback_dir
 
+def load_gui_modules():
+    """Importar los módulos de la interfaz gráfica (tkinter, pyautogui, keyboard) una sola vez"""
+    global tk, filedialog, messagebox, ttk, pyautogui, keyboard
+    if tk is not None:
+        return
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+    import pyautogui
+    import keyboard
+
+def open_file(path):
+    """Abrir un archivo con la aplicación predeterminada del sistema (sin pasar por una shell)"""
+    if sys.platform.startswith('win'):
+        os.startfile(path)
+        return
+    opener = 'open' if sys.platform == 'darwin' else 'xdg-open'
+    subprocess.Popen([opener, str(path)], start_new_session=True,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
 
 # ===================== EXTRACTOR ===================== #
 class MLProductExtractor:
-    def __init__(self):
+    def __init__(self, debug_enabled=False):
         self.products = []
         self.filtered_products = []  # productos filtrados
         self.urgent_products = []    # NUEVO: productos urgentes (a acordar después de ayer 16:00)
         self.to_review_products = [] # NUEVO: productos a revisar (a acordar antes de ayer 16:00)
         self.debug_report = []
+        # Detalle completo en el reporte (método/elemento fuente por campo). Se activa con --debug
+        self.debug_enabled = debug_enabled
         
         # NUEVO: Calcular umbral temporal (ayer a las 16:00)
         self.temporal_threshold = self._calculate_temporal_threshold()
+        # Año asumido para fechas sin año ("21 jul"), fijado una vez por corrida
+        self.default_year = datetime.now().year
         
         self.stats = {
             'total_found': 0,
@@ -165,13 +343,24 @@ class MLProductExtractor:
             'to_review_count': 0,     # NUEVO: contador de "a revisar"
             'normal_count': 0,        # NUEVO: contador de productos normales
             'final_count': 0,
-            'filter_reasons': {},
+            'filter_reasons': Counter(),
             'fields_completeness': {
                 'nombre': 0, 'link': 0, 'imagen': 0,
                 'precio': 0, 'cantidad': 0, 'sku': 0
             }
         }
         self.base_dir = None
+        self._raw_html = None  # HTML leído por load_html, solo durante process_html
+        # (contenedor, html) del último contenedor serializado - ver _container_html
+        self._html_cache = None
+        # (contenedor, texto) del último contenedor - ver _container_text
+        self._text_cache = None
+        # (fila, textos) de la última fila de producto recorrida - ver _row_strings
+        self._strings_cache = None
+        # Listas de estados para el reporte; se arman al procesar (filter_states puede cambiar tras __init__)
+        self._states_snapshot = None
+        # Pocos estados distintos se repiten en todos los pedidos: razón de filtrado memoizada por estado
+        self._status_filter_reason = lru_cache(maxsize=256)(self._status_filter_reason)
         
         # Estados a filtrar (puedes agregar más aquí)
         self.filter_states = [
@@ -209,17 +398,23 @@ class MLProductExtractor:
             'avisar entrega'
         ]
         
-        # Lista de productos conocidos que fueron reprogramados (por SKU o nombre)
-        self.known_reprogrammed_products = [
+        # Productos conocidos que fueron reprogramados (por SKU o nombre) - frozenset para búsqueda O(1)
+        self.known_reprogrammed_products = frozenset([
             'STOCK A2-9',
             'Balanza Digital Joyería, Balanza Precisión, Báscula Joyería'
-        ]
+        ])
         
-        # Lista de productos conocidos que han estado demorados
-        self.known_delayed_products = [
+        # Productos conocidos que han estado demorados
+        self.known_delayed_products = frozenset([
             'SKU233',
             'Pulsera Con Imanes Unisex Terap. Adelgaza- Artritis Y Stress Plateado 0 Mm'
-        ]
+        ])
+
+        # Pedidos conocidos problemáticos (por ID)
+        self.known_problematic_orders = frozenset([
+            '2000008407186271',
+            '2000012378209506'
+        ])
 
     def _calculate_temporal_threshold(self):
         """
@@ -256,34 +451,48 @@ class MLProductExtractor:
         
         return threshold
 
-    def detect_encoding(self, file_path):
+    def decode_html(self, raw):
+        """Decodifica los bytes del archivo probando encodings en orden (el archivo se lee una sola vez)"""
         for enc in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
             try:
-                file_path.read_text(encoding=enc)
+                html = raw.decode(enc)
                 logger.info(f"Encoding detectado: {enc}")
-                return enc
+                return html
             except UnicodeDecodeError:
                 pass
         logger.warning("No se detectó encoding. Uso utf-8 errors='ignore'.")
-        return 'utf-8'
+        return raw.decode('utf-8', errors='ignore')
 
     def load_html(self, file_path):
         self.base_dir = file_path.parent
-        enc = self.detect_encoding(file_path)
-        html = file_path.read_text(encoding=enc, errors='ignore')
-        logger.info(f"Archivo cargado: {file_path.name} ({len(html)} bytes)")
-        return BeautifulSoup(html, 'html.parser')
+        raw = file_path.read_bytes()
+        html = self.decode_html(raw)
+        if '\r' in html:
+            # Mismos saltos de línea que con read_text (modo texto: \r\n y \r -> \n)
+            html = html.replace('\r\n', '\n').replace('\r', '\n')
+        self._raw_html = html  # solo para _diagnose_structure; se suelta al terminar process_html
+        logger.info(f"Archivo cargado: {file_path.name} ({len(raw)} bytes) - parser: {HTML_PARSER}")
+        # Si la página tiene tarjetas de pedido, parsear solo esas (se ignoran head, scripts
+        # globales, navbar, etc.). Si no, árbol completo para las estrategias alternativas.
+        soup = None
+        if 'row-card-container' in html:
+            soup = BeautifulSoup(html, HTML_PARSER, parse_only=ORDER_CARD_STRAINER)
+            if not soup.contents:
+                soup = None
+        if soup is None:
+            soup = BeautifulSoup(html, HTML_PARSER)
+        # <style>/<link> no aportan texto ni datos: se sacan del árbol para que los recorridos
+        # y str(contenedor) sean más livianos. <script> (JSON de estado) y <noscript> (imágenes) quedan.
+        for el in soup.find_all(NON_CONTENT_TAGS):
+            el.decompose()
+        return soup
 
     def find_element_flexible(self, parent, strategies):
         for strat in strategies:
             try:
                 t = strat['type']
                 if t == 'class':
-                    el = parent.find(class_=strat['value'])
-                    if el:
-                        return el
-                    pat = re.compile(rf".*\b{re.escape(strat['value'])}\b.*")
-                    el = parent.find(class_=pat)
+                    el = self._find_class(parent, strat['value'])
                     if el:
                         return el
                 elif t == 'css':
@@ -291,9 +500,16 @@ class MLProductExtractor:
                     if el:
                         return el
                 elif t == 'tag_text':
-                    for el in parent.find_all(strat['tag']):
-                        if strat['text_pattern'].lower() in el.get_text(strip=True).lower():
-                            return el
+                    tag_name = strat['tag']
+                    pattern = strat['text_pattern'].lower()
+                    # Si el texto del padre no contiene el patrón, ningún tag interno lo contiene
+                    if pattern not in parent.get_text(strip=True).lower():
+                        continue
+                    # find() corta en el primer tag que coincide, en orden de documento
+                    el = parent.find(lambda tag: tag.name == tag_name
+                                     and pattern in tag.get_text(strip=True).lower())
+                    if el:
+                        return el
                 elif t == 'custom':
                     el = strat['function'](parent)
                     if el:
@@ -302,24 +518,112 @@ class MLProductExtractor:
                 logger.debug(f"Estrategia falló {strat}: {e}")
         return None
 
+    def _find_class(self, parent, value):
+        """
+        Primer elemento con la clase exacta `value`; si no hay, el primero cuya clase la contiene
+        como palabra. Igual que find(class_=value) con find(class_=_class_word_pattern(value))
+        de respaldo, pero en un solo recorrido del árbol.
+        """
+        classed = []
+        for el in parent.descendants:
+            if not isinstance(el, Tag):
+                continue
+            classes = el.get('class')
+            if classes:
+                if value in classes:
+                    return el
+                classed.append((el, classes))
+        # Sin clase exacta: primer elemento (en orden de documento) que la contiene como palabra
+        pattern = _class_word_pattern(value)
+        for el, classes in classed:
+            if any(pattern.search(c) for c in classes) or pattern.search(' '.join(classes)):
+                return el
+        return None
+
+    def _find_class_part(self, parent, part, name=None):
+        """
+        Primer elemento (opcionalmente de tag `name`) con alguna clase que contiene `part`.
+        Igual que find(name, class_=re.compile(part)) para un texto sin metacaracteres ni espacios,
+        pero con `in` sobre las clases en lugar de pasar cada elemento por el matcher de bs4.
+        """
+        for el in parent.descendants:
+            if not isinstance(el, Tag) or (name is not None and el.name != name):
+                continue
+            classes = el.get('class')
+            if classes:
+                for cls in classes:
+                    if part in cls:
+                        return el
+        return None
+
+    def _first_matching_state(self, states, text):
+        """
+        Devuelve el primer estado de `states` (en orden de la lista) contenido en `text`,
+        sin distinguir mayúsculas. Una única búsqueda con regex descarta el caso común (sin coincidencias).
+        """
+        states = tuple(states)
+        if not text or not _states_regex(states).search(text):
+            return None
+        text_lower = text.lower()
+        for state, state_lower in _lowered_states(states):
+            if state_lower in text_lower:
+                return state
+        return None
+
+    def _container_html(self, container):
+        """
+        HTML serializado del contenedor, reutilizado mientras se procesa el mismo contenedor.
+        (Los Tag de bs4 se hashean serializándose, por eso se compara por identidad y no con un dict)
+        """
+        cached = self._html_cache
+        if cached is not None and cached[0] is container:
+            return cached[1]
+        html = str(container)
+        self._html_cache = (container, html)
+        return html
+
+    def _container_text(self, container):
+        """get_text(separator=' ', strip=True) del contenedor, calculado una vez por contenedor"""
+        cached = self._text_cache
+        if cached is not None and cached[0] is container:
+            return cached[1]
+        text = container.get_text(separator=' ', strip=True)
+        self._text_cache = (container, text)
+        return text
+
+    def _row_strings(self, product_row):
+        """stripped_strings de la fila de producto como lista, recorrida una sola vez por fila"""
+        cached = self._strings_cache
+        if cached is not None and cached[0] is product_row:
+            return cached[1]
+        strings = list(product_row.stripped_strings)
+        self._strings_cache = (product_row, strings)
+        return strings
+
+    def _find_within(self, parent, outer, inner):
+        """Equivalente nativo de select_one('<outer> <inner>'): outer/inner son kwargs de find()"""
+        for wrapper in parent.find_all(**outer):
+            el = wrapper.find(**inner)
+            if el:
+                return el
+        return None
+
     def extract_order_status(self, container):
         """
         Extrae el estado del pedido desde diferentes ubicaciones posibles en el HTML
         """
         # ESTRATEGIA 1: Buscar en elementos HTML visibles
         status_strategies = [
-            {'type': 'css', 'value': '.sc-status-action-row__status'},
-            {'type': 'css', 'value': 'span.sc-status-action-row__status'},
             {'type': 'class', 'value': 'sc-status-action-row__status'},
-            {'type': 'css', 'value': '.sc-status-action-row-status'},
-            {'type': 'css', 'value': 'span[class*="status"]'},
-            {'type': 'custom', 'function': lambda p: p.find('span', text=re.compile(r'reprogramado|cancelado|devuelto|reembolsado|demorado|acuerdas|acuerda|acordar', re.I))},
+            {'type': 'custom', 'function': lambda p: p.find(class_='sc-status-action-row-status')},
+            {'type': 'custom', 'function': lambda p: self._find_class_part(p, 'status', 'span')},
+            {'type': 'custom', 'function': lambda p: p.find('span', text=RE_STATUS_KEYWORDS)},
         ]
         
         status_el = self.find_element_flexible(container, status_strategies)
         if status_el:
             status_text = status_el.get_text(strip=True).lower()
-            logger.debug(f"Estado encontrado en HTML: {status_text}")
+            logger.debug("Estado encontrado en HTML: %s", status_text)
             return status_text
         
         # ESTRATEGIA 2: Buscar en JSON embebido dentro de scripts
@@ -327,62 +631,49 @@ class MLProductExtractor:
         for script in scripts:
             if script.string:
                 script_content = script.string
-                status_match = re.search(r'"status"\s*:\s*"([^"]*)"', script_content, re.I)
+                status_match = RE_JSON_STATUS.search(script_content)
                 if status_match:
                     status_from_json = status_match.group(1).lower()
-                    logger.debug(f"Estado encontrado en JSON: {status_from_json}")
+                    logger.debug("Estado encontrado en JSON: %s", status_from_json)
                     # Verificar si contiene palabras clave relevantes (mejorado)
-                    all_keywords = self.filter_states + self.temporal_states
-                    for keyword in all_keywords:
-                        if keyword.lower() in status_from_json:
-                            return status_from_json
+                    if _states_regex(tuple(self.filter_states) + tuple(self.temporal_states)).search(status_from_json):
+                        return status_from_json
                     
                     # NUEVO: Verificaciones adicionales para estados ML
-                    if any(word in status_from_json for word in ['cancelad', 'devuelt', 'reembolsad']):
+                    if RE_JSON_FILTER_WORDS.search(status_from_json):
                         return status_from_json
         
         # ESTRATEGIA 3: Buscar en todo el texto del contenedor
-        all_text = container.get_text(separator=' ', strip=True).lower()
+        all_text = self._container_text(container)
         
         # Buscar patrones específicos de estados temporales PRIMERO
-        temporal_patterns = [
-            r'acuerdas?\s+la\s+entrega',
-            r'acuerdo\s+la\s+entrega',
-            r'a\s+acordar\s+con\s+el\s+comprador',
-            r'contacta[rt]?e?\s+con\s+tu\s+comprador',
-            r'avisar\s+entrega'
-        ]
-        
-        for pattern in temporal_patterns:
-            if re.search(pattern, all_text, re.I):
-                found_text = re.search(pattern, all_text, re.I).group(0)
-                logger.debug(f"Estado temporal encontrado por patrón: {found_text}")
-                return found_text
+        # (gana el patrón de mayor prioridad; dentro del mismo patrón, la primera aparición)
+        best = None
+        for match in RE_TEMPORAL_ANY.finditer(all_text):
+            if best is None or match.lastindex < best.lastindex:
+                best = match
+                if best.lastindex == 1:
+                    break
+        if best:
+            found_text = best.group(0).lower()
+            logger.debug("Estado temporal encontrado por patrón: %s", found_text)
+            return found_text
         
         # Luego buscar otros estados de filtro
-        for filter_state in self.filter_states:
-            if filter_state.lower() in all_text:
-                logger.debug(f"Estado encontrado en texto completo: {filter_state}")
-                return filter_state.lower()
+        filter_state = self._first_matching_state(self.filter_states, all_text)
+        if filter_state:
+            logger.debug("Estado encontrado en texto completo: %s", filter_state)
+            return filter_state.lower()
         
         # ESTRATEGIA 4: Buscar patrones de JSON en todo el HTML como texto
-        container_html = str(container)
-        json_patterns = [
-            r'"status"\s*:\s*"([^"]*acuerd[^"]*)"',
-            r'"status"\s*:\s*"([^"]*acordar[^"]*)"',
-            r'"status"\s*:\s*"([^"]*reprogramado[^"]*)"',
-            r'"status"\s*:\s*"([^"]*cancelad[^"]*)"',  # MEJORADO: Captura "cancelado" y "cancelada"
-            r'"status"\s*:\s*"([^"]*devuelt[^"]*)"',   # MEJORADO: Captura "devuelto" y "devuelta"
-            r'"status"\s*:\s*"([^"]*reembolsad[^"]*)"', # MEJORADO: Captura "reembolsado" y "reembolsada"
-            r'"status"\s*:\s*"([^"]*demorado[^"]*)"'
-        ]
-        
-        for pattern in json_patterns:
-            match = re.search(pattern, container_html, re.I)
-            if match:
-                status_from_pattern = match.group(1).lower()
-                logger.debug(f"Estado encontrado por patrón JSON: {status_from_pattern}")
-                return status_from_pattern
+        # Una sola pasada junta todos los "status" relevantes; luego se elige por prioridad de palabra clave
+        container_html = self._container_html(container)
+        json_statuses = [m.group(1).lower() for m in RE_JSON_STATUS_ANY.finditer(container_html)]
+        for keyword in JSON_STATUS_KEYWORDS:
+            for status_from_pattern in json_statuses:
+                if keyword in status_from_pattern:
+                    logger.debug("Estado encontrado por patrón JSON: %s", status_from_pattern)
+                    return status_from_pattern
         
         return ""
 
@@ -393,11 +684,11 @@ class MLProductExtractor:
         """
         # Buscar elementos de fecha con diferentes estrategias
         date_strategies = [
-            {'type': 'css', 'value': '.pack-status-info__date'},
-            {'type': 'css', 'value': '.ui-pack-status-date'},
-            {'type': 'css', 'value': '[class*="date"]'},
-            {'type': 'css', 'value': '[class*="fecha"]'},
-            {'type': 'custom', 'function': lambda p: p.find(text=re.compile(r'\d{1,2}\s+(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)', re.I))},
+            {'type': 'custom', 'function': lambda p: p.find(class_='pack-status-info__date')},
+            {'type': 'custom', 'function': lambda p: p.find(class_='ui-pack-status-date')},
+            {'type': 'custom', 'function': lambda p: self._find_class_part(p, 'date')},
+            {'type': 'custom', 'function': lambda p: self._find_class_part(p, 'fecha')},
+            {'type': 'custom', 'function': lambda p: p.find(text=RE_DATE_TEXT)},
         ]
         
         date_element = self.find_element_flexible(container, date_strategies)
@@ -405,8 +696,8 @@ class MLProductExtractor:
             date_text = date_element.get_text(strip=True) if hasattr(date_element, 'get_text') else str(date_element)
         else:
             # Buscar en todo el texto del contenedor
-            all_text = container.get_text(separator=' ', strip=True)
-            date_match = re.search(r'(\d{1,2}\s+(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)(?:\s+\d{4})?(?:\s+\d{1,2}:\d{2})?)', all_text, re.I)
+            all_text = self._container_text(container)
+            date_match = RE_DATE_IN_TEXT.search(all_text)
             if date_match:
                 date_text = date_match.group(1)
             else:
@@ -427,35 +718,24 @@ class MLProductExtractor:
             # Limpiar el texto
             date_text = date_text.strip().lower()
             
-            # Mapeo de meses en español
-            month_mapping = {
-                'ene': 1, 'feb': 2, 'mar': 3, 'abr': 4, 'may': 5, 'jun': 6,
-                'jul': 7, 'ago': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dic': 12
-            }
-            
-            # Extraer componentes usando regex
-            # Patrón más completo: día + mes + (año opcional) + (hora opcional)
-            pattern = r'(\d{1,2})\s+(\w{3})(?:\s+(\d{4}))?(?:\s+(\d{1,2}):(\d{2}))?'
-            match = re.search(pattern, date_text, re.I)
+            # Extraer componentes: día + mes + (año opcional) + (hora opcional)
+            components = _ml_date_components(date_text)
             
-            if not match:
+            if not components:
                 logger.warning(f"No se pudo parsear fecha: {date_text}")
                 return None
             
-            day = int(match.group(1))
-            month_text = match.group(2).lower()
-            year = int(match.group(3)) if match.group(3) else datetime.now().year
-            hour = int(match.group(4)) if match.group(4) else 0
-            minute = int(match.group(5)) if match.group(5) else 0
+            day, month_text, year, hour, minute = components
+            if year is None:
+                year = self.default_year
             
-            if month_text not in month_mapping:
+            month = MONTH_MAP.get(month_text)
+            if month is None:
                 logger.warning(f"Mes no reconocido: {month_text}")
                 return None
-                
-            month = month_mapping[month_text]
             
             parsed_date = datetime(year, month, day, hour, minute)
-            logger.debug(f"Fecha parseada: '{date_text}' -> {parsed_date}")
+            logger.debug("Fecha parseada: '%s' -> %s", date_text, parsed_date)
             return parsed_date
             
         except Exception as e:
@@ -471,13 +751,7 @@ class MLProductExtractor:
             return None
             
         # Verificar si el estado es uno de los temporales
-        is_temporal = False
-        for temporal_state in self.temporal_states:
-            if temporal_state.lower() in status.lower():
-                is_temporal = True
-                break
-                
-        if not is_temporal:
+        if not _states_regex(tuple(self.temporal_states)).search(status):
             return None
             
         # Si no tenemos fecha, asumir que es urgente (mejor ser conservador)
@@ -487,63 +761,68 @@ class MLProductExtractor:
             
         # Comparar con el umbral
         if order_date > self.temporal_threshold:
-            logger.debug(f"Producto temporal URGENTE: {order_date} > {self.temporal_threshold}")
+            logger.debug("Producto temporal URGENTE: %s > %s", order_date, self.temporal_threshold)
             return 'urgent'
         else:
-            logger.debug(f"Producto temporal A REVISAR: {order_date} <= {self.temporal_threshold}")
+            logger.debug("Producto temporal A REVISAR: %s <= %s", order_date, self.temporal_threshold)
             return 'to_review'
 
-    def should_filter_product(self, container, product_data):
+    def _status_filter_reason(self, status, filter_states):
         """
-        Determina si un producto debe ser filtrado basado en su estado o historial conocido
-        Retorna (debe_filtrar, razon)
+        Razón de filtrado según el estado del pedido ('' si el estado no filtra).
+        Depende solo del estado y de la tupla de estados de filtro: se memoiza en __init__.
         """
-        # ESTRATEGIA 1: Verificar estado actual (solo estados de filtro, no temporales)
-        status = self.extract_order_status(container)
-        
-        if status:
-            # Verificar si el estado actual coincide con alguno de los filtros (NO temporales)
-            # MEJORADO: Búsqueda más flexible para capturar variaciones
-            status_lower = status.lower()
-            for filter_state in self.filter_states:
-                filter_lower = filter_state.lower()
-                if filter_lower in status_lower:
-                    return True, f"estado actual: {filter_state}"
-            
+        # Verificar si el estado actual coincide con alguno de los filtros (NO temporales)
+        # MEJORADO: Búsqueda más flexible para capturar variaciones
+        # (extract_order_status ya devuelve el estado en minúsculas)
+        status_lower = status
+        filter_state = self._first_matching_state(filter_states, status_lower)
+        if filter_state:
+            return f"estado actual: {filter_state}"
+        
+        # Una sola pasada decide si hace falta revisar las variantes de ML una por una
+        if RE_ML_FILTER_HINTS.search(status_lower):
             # NUEVO: Verificaciones adicionales para estados específicos de ML
             if 'cancelad' in status_lower:  # Captura "cancelado", "cancelada", etc.
-                return True, f"estado actual: cancelada (ML)"
+                return f"estado actual: cancelada (ML)"
             if 'cancelaste' in status_lower:  # Captura "cancelaste la venta"
-                return True, f"estado actual: cancelaste la venta (ML)"
+                return f"estado actual: cancelaste la venta (ML)"
             if 'comprador cancel' in status_lower:  # Captura "cancelada por el comprador"
-                return True, f"estado actual: cancelada por comprador (ML)"
+                return f"estado actual: cancelada por comprador (ML)"
             if 'devuelt' in status_lower:   # Captura "devuelto", "devuelta", etc.
-                return True, f"estado actual: devuelto (ML)"
+                return f"estado actual: devuelto (ML)"
             if 'reembolsad' in status_lower:  # Captura "reembolsado", "reembolsada", etc.
-                return True, f"estado actual: reembolsado (ML)"
+                return f"estado actual: reembolsado (ML)"
             if 'reclam' in status_lower:  # Captura "reclamo", "reclamos", etc.
-                return True, f"estado actual: reclamo (ML)"
+                return f"estado actual: reclamo (ML)"
             if 'mediaci' in status_lower:  # Captura "mediación", "mediacion", etc.
-                return True, f"estado actual: mediación (ML)"
+                return f"estado actual: mediación (ML)"
             # CORREGIDO: Solo filtrar productos realmente entregados, no los que están en camino
             # Los productos "en camino", "en tránsito", "enviado" NO son entregados
             # Solo filtrar si realmente dice que fue entregado
-            if any(entregado_term in status_lower for entregado_term in [
-                'entregado al conductor',
-                'entregado',
-                'fue entregado', 
-                'ya fue entregado',
-                'producto entregado',
-                'pedido entregado',
-                'envío entregado',
-                'entrega completada',
-                'entrega finalizada'
-            ]):
-                return True, f"estado actual: entregado (ML)"
-            
+            if RE_DELIVERED.search(status_lower):
+                return f"estado actual: entregado (ML)"
+        
             # Filtrar otros problemas específicos
             if 'problema' in status_lower or 'pendiente' in status_lower:
-                return True, f"estado actual: problema/pendiente (ML)"
+                return f"estado actual: problema/pendiente (ML)"
+        
+        return ''
+
+    def should_filter_product(self, container, product_data, status=None, order_id=None):
+        """
+        Determina si un producto debe ser filtrado basado en su estado o historial conocido
+        Retorna (debe_filtrar, razon)
+        status/order_id: valores ya extraídos del contenedor (se recalculan si son None)
+        """
+        # ESTRATEGIA 1: Verificar estado actual (solo estados de filtro, no temporales)
+        if status is None:
+            status = self.extract_order_status(container)
+        
+        if status:
+            reason = self._status_filter_reason(status, tuple(self.filter_states))
+            if reason:
+                return True, reason
         
         # ESTRATEGIA 2: Verificar productos conocidos como reprogramados (por SKU)
         product_sku = product_data.get('sku', '').strip()
@@ -564,66 +843,65 @@ class MLProductExtractor:
             return True, f"producto conocido demorado (nombre: {product_name[:30]}...)"
         
         # ESTRATEGIA 6: Buscar patrones en la URL o ID del pedido que indiquen problemas
-        order_id = self._extract_order_id(container)
-        if order_id:
-            known_problematic_orders = [
-                '2000008407186271',
-                '2000012378209506'   
-            ]
-            if order_id in known_problematic_orders:
-                return True, f"pedido conocido problemático (ID: {order_id})"
+        if order_id is None:
+            order_id = self._extract_order_id(container)
+        if order_id and order_id in self.known_problematic_orders:
+            return True, f"pedido conocido problemático (ID: {order_id})"
         
         return False, ""
 
     def _extract_order_id(self, container):
         """Extrae el ID del pedido del contenedor"""
-        id_patterns = [
-            r'#(\d+)',
-            r'pack_id["\']?\s*:\s*["\']?(\d+)',
-            r'order[_-]?id["\']?\s*:\s*["\']?(\d+)',
-        ]
-        
-        container_text = str(container)
-        for pattern in id_patterns:
-            match = re.search(pattern, container_text, re.I)
+        container_text = self._container_html(container)
+        for pattern in ORDER_ID_PATTERNS:
+            match = pattern.search(container_text)
             if match:
                 return match.group(1)
         
-        id_elements = container.find_all(class_=re.compile('pack.id|order.id|left-column__pack-id'))
+        id_elements = container.find_all(class_=RE_ORDER_ID_CLASS)
         for element in id_elements:
             text = element.get_text(strip=True)
-            match = re.search(r'(\d{10,})', text)
+            match = RE_LONG_NUMBER.search(text)
             if match:
                 return match.group(1)
         
         return None
 
     def _get_longest_text(self, parent):
-        """Helper para encontrar el div con más texto"""
-        divs = parent.find_all('div')
-        if not divs:
+        """
+        Helper para encontrar el div con más texto.
+        Un div nunca tiene menos texto que sus divs internos y aparece antes que ellos,
+        así que alcanza con medir los divs de primer nivel (sin div ancestro dentro de parent).
+        """
+        top_divs = []
+        pending = [child for child in parent.children if isinstance(child, Tag)]
+        pending.reverse()
+        while pending:
+            el = pending.pop()
+            if el.name == 'div':
+                top_divs.append(el)
+            else:
+                children = [child for child in el.children if isinstance(child, Tag)]
+                children.reverse()
+                pending.extend(children)
+        if not top_divs:
             return None
         
-        max_text = ""
-        max_div = None
-        for div in divs:
-            text = div.get_text(strip=True)
-            if len(text) > len(max_text):
-                max_text = text
-                max_div = div
-        
-        return max_div
+        max_div = max(top_divs, key=lambda div: len(div.get_text(strip=True)))
+        return max_div if max_div.get_text(strip=True) else None
+
+    def _get_product_row(self, container):
+        """Fila de producto del contenedor (o el propio contenedor si no tiene)"""
+        return self._find_class_part(container, 'sc-product-row') or container
 
-    def extract_product_name(self, container):
-        product_row = container.find(class_=re.compile('sc-product-row'))
-        if not product_row:
-            product_row = container
+    def extract_product_name(self, container, product_row=None):
+        if product_row is None:
+            product_row = self._get_product_row(container)
             
-        desc = product_row.find(class_=re.compile(r'description-container'))
+        desc = self._find_class_part(product_row, 'description-container')
         if desc:
             el = self.find_element_flexible(desc, [
                 {'type': 'class', 'value': 'label'},
-                {'type': 'css', 'value': '.label'},
                 {'type': 'custom', 'function': lambda p: self._get_longest_text(p)}
             ])
             if el:
@@ -632,14 +910,14 @@ class MLProductExtractor:
             return max(texts, key=len, default='')
         return ""
 
-    def extract_product_link(self, container):
-        product_row = container.find(class_=re.compile('sc-product-row'))
-        if not product_row:
-            product_row = container
+    def extract_product_link(self, container, product_row=None):
+        if product_row is None:
+            product_row = self._get_product_row(container)
             
         el = self.find_element_flexible(product_row, [
-            {'type': 'css', 'value': '.description-container a.redirect-row[href]'},
-            {'type': 'custom', 'function': lambda p: p.find('a', href=re.compile(r'articulo\.mercadolibre'))}
+            {'type': 'custom', 'function': lambda p: self._find_within(
+                p, {'class_': 'description-container'}, {'name': 'a', 'class_': 'redirect-row', 'href': True})},
+            {'type': 'custom', 'function': lambda p: p.find('a', href=RE_ARTICLE_LINK)}
         ])
         if el and el.get('href'):
             href = el['href']
@@ -649,12 +927,11 @@ class MLProductExtractor:
         return ""
 
     def _from_srcset(self, srcset):
-        try:
-            parts = [p.strip() for p in srcset.split(',') if p.strip()]
-            if parts:
-                return parts[-1].split()[0]
-        except Exception:
-            pass
+        """URL del último candidato (el de mayor resolución) de un srcset"""
+        for part in reversed(srcset.split(',')):
+            part = part.strip()
+            if part:
+                return part.split()[0]
         return ''
 
     def _resolve_url(self, src):
@@ -663,7 +940,7 @@ class MLProductExtractor:
         src = src.strip().strip('"\'')
         if src.startswith('//'):
             return 'https:' + src
-        if re.match(r'^https?://', src, re.I):
+        if RE_HTTP_URL.match(src):
             return src
         if self.base_dir:
             full = (self.base_dir / src).resolve()
@@ -671,19 +948,23 @@ class MLProductExtractor:
                 return str(full)
         return src
 
-    def extract_product_image(self, container):
+    def extract_product_image(self, container, product_row=None):
         """Versión mejorada que busca imágenes de mejor calidad"""
-        product_row = container.find(class_=re.compile('sc-product-row'))
-        if not product_row:
-            product_row = container
+        if product_row is None:
+            product_row = self._get_product_row(container)
             
         img_strategies = [
-            {'type': 'css', 'value': '.sc-product-picture__single-item img[src*="-I.jpg"]'},
-            {'type': 'css', 'value': '.sc-product-picture__single-item img[src*="-O.jpg"]'},
-            {'type': 'css', 'value': '.sc-product-picture__single-item img'},
-            {'type': 'css', 'value': '.sc-product-picture img'},
-            {'type': 'css', 'value': 'a[data-testid="redirect-img"] img'},
-            {'type': 'custom', 'function': lambda p: p.find('img', src=re.compile(r'mlstatic.*\.(jpg|jpeg|png|webp)', re.I))},
+            {'type': 'custom', 'function': lambda p: self._find_within(
+                p, {'class_': 'sc-product-picture__single-item'}, {'name': 'img', 'src': RE_IMG_LARGE})},
+            {'type': 'custom', 'function': lambda p: self._find_within(
+                p, {'class_': 'sc-product-picture__single-item'}, {'name': 'img', 'src': RE_IMG_ORIGINAL})},
+            {'type': 'custom', 'function': lambda p: self._find_within(
+                p, {'class_': 'sc-product-picture__single-item'}, {'name': 'img'})},
+            {'type': 'custom', 'function': lambda p: self._find_within(
+                p, {'class_': 'sc-product-picture'}, {'name': 'img'})},
+            {'type': 'custom', 'function': lambda p: self._find_within(
+                p, {'name': 'a', 'attrs': {'data-testid': 'redirect-img'}}, {'name': 'img'})},
+            {'type': 'custom', 'function': lambda p: p.find('img', src=RE_MLSTATIC_IMG)},
             {'type': 'custom', 'function': lambda p: p.find('img')}
         ]
         
@@ -706,25 +987,25 @@ class MLProductExtractor:
             if fallback_url:
                 return fallback_url
         
-        div_bg = product_row.find(style=re.compile('background-image', re.I))
+        div_bg = product_row.find(style=RE_BACKGROUND_IMAGE)
         if div_bg and div_bg.get('style'):
-            m = re.search(r'url\(([^)]+)\)', div_bg['style'])
+            m = RE_CSS_URL.search(div_bg['style'])
             if m:
                 return self._resolve_url(m.group(1))
         
-        img2 = product_row.find('img', src=re.compile('mlstatic'))
+        img2 = product_row.find('img', src=RE_MLSTATIC)
         if img2 and img2.get('src'):
             return self._resolve_url(img2['src'])
         
         return ""
 
-    def extract_price(self, container):
-        product_row = container.find(class_=re.compile('sc-product-row'))
-        if not product_row:
-            product_row = container
+    def extract_price(self, container, product_row=None):
+        if product_row is None:
+            product_row = self._get_product_row(container)
             
         el = self.find_element_flexible(product_row, [
-            {'type': 'css', 'value': '.price-container .price'},
+            {'type': 'custom', 'function': lambda p: self._find_within(
+                p, {'class_': 'price-container'}, {'class_': 'price'})},
             {'type': 'class', 'value': 'price'},
             {'type': 'tag_text', 'tag': 'span', 'text_pattern': '$'}
         ])
@@ -732,40 +1013,36 @@ class MLProductExtractor:
             txt = el.get_text(strip=True)
             if '$' in txt:
                 return txt
-        for txt in product_row.stripped_strings:
+        for txt in self._row_strings(product_row):
             if '$' in txt and any(c.isdigit() for c in txt):
                 return txt
         return ""
 
-    def extract_quantity(self, container):
-        product_row = container.find(class_=re.compile('sc-product-row'))
-        if not product_row:
-            product_row = container
+    def extract_quantity(self, container, product_row=None):
+        if product_row is None:
+            product_row = self._get_product_row(container)
             
         el = self.find_element_flexible(product_row, [
             {'type': 'class', 'value': 'unit'},
-            {'type': 'css', 'value': 'span.unit'},
             {'type': 'tag_text', 'tag': 'span', 'text_pattern': 'unidad'}
         ])
         if el:
-            m = re.search(r'(\d+)', el.get_text(strip=True))
+            m = RE_NUMBER.search(el.get_text(strip=True))
             if m:
                 return m.group(1)
-        for txt in product_row.stripped_strings:
+        for txt in self._row_strings(product_row):
             if 'unidad' in txt.lower():
-                m = re.search(r'(\d+)', txt)
+                m = RE_NUMBER.search(txt)
                 if m:
                     return m.group(1)
         return ""
 
-    def extract_sku(self, container):
-        product_row = container.find(class_=re.compile('sc-product-row'))
-        if not product_row:
-            product_row = container
+    def extract_sku(self, container, product_row=None):
+        if product_row is None:
+            product_row = self._get_product_row(container)
             
         el = self.find_element_flexible(product_row, [
             {'type': 'class', 'value': 'sku'},
-            {'type': 'css', 'value': 'span.sku'},
             {'type': 'tag_text', 'tag': 'span', 'text_pattern': 'SKU:'}
         ])
         if el:
@@ -773,11 +1050,35 @@ class MLProductExtractor:
             if 'SKU:' in txt:
                 return txt.split('SKU:')[-1].strip()
             return txt
-        for txt in product_row.stripped_strings:
+        for txt in self._row_strings(product_row):
             if 'SKU:' in txt:
                 return txt.split('SKU:')[-1].strip()
         return ""
 
+    def _checked_states_snapshot(self):
+        """
+        Listas de estados/productos verificados para el reporte, como tuplas compartidas
+        por todos los contenedores de la corrida (en vez de copiarlas por contenedor).
+        """
+        if self._states_snapshot is None:
+            self._states_snapshot = {
+                'filter_states_checked': tuple(self.filter_states),
+                'temporal_states_checked': tuple(self.temporal_states),
+                'known_reprogrammed_products': tuple(sorted(self.known_reprogrammed_products)),
+                'known_delayed_products': tuple(sorted(self.known_delayed_products)),
+            }
+        return self._states_snapshot
+
+    def _field_details(self, container, field_type, value, product_row):
+        """Detalle de extracción de un campo para el reporte (método y fuente solo con debug_enabled)"""
+        if not self.debug_enabled:
+            return {'value': value, 'method_used': DEBUG_DISABLED_NOTE, 'source_element': DEBUG_DISABLED_NOTE}
+        return {
+            'value': value,
+            'method_used': self._get_extraction_method_name(container, field_type),
+            'source_element': self._find_source_element_info(container, field_type, product_row)
+        }
+
     def extract_product(self, container):
         container_id = len(self.debug_report) + 1
         report = {
@@ -789,62 +1090,42 @@ class MLProductExtractor:
             'final_result': {}
         }
         
-        # Extraer datos del producto
+        # Extraer datos del producto (la fila de producto se busca una sola vez)
         product = {}
+        product_row = self._get_product_row(container)
         
-        nombre = self.extract_product_name(container)
+        nombre = self.extract_product_name(container, product_row)
         product['nombre'] = nombre
-        report['extraction_details']['nombre'] = {
-            'value': nombre,
-            'method_used': self._get_extraction_method_name(container, 'nombre'),
-            'source_element': self._find_source_element_info(container, 'nombre')
-        }
+        report['extraction_details']['nombre'] = self._field_details(container, 'nombre', nombre, product_row)
         
-        link = self.extract_product_link(container)
+        link = self.extract_product_link(container, product_row)
         product['link'] = link
-        report['extraction_details']['link'] = {
-            'value': link,
-            'method_used': self._get_extraction_method_name(container, 'link'),
-            'source_element': self._find_source_element_info(container, 'link')
-        }
+        report['extraction_details']['link'] = self._field_details(container, 'link', link, product_row)
         
-        imagen = self.extract_product_image(container)
+        imagen = self.extract_product_image(container, product_row)
         product['imagen'] = imagen
-        report['extraction_details']['imagen'] = {
-            'value': imagen[:100] + '...' if len(str(imagen)) > 100 else imagen,
-            'method_used': self._get_extraction_method_name(container, 'imagen'),
-            'source_element': self._find_source_element_info(container, 'imagen')
-        }
+        report['extraction_details']['imagen'] = self._field_details(
+            container, 'imagen', imagen[:100] + '...' if len(str(imagen)) > 100 else imagen, product_row)
         
-        precio = self.extract_price(container)
+        precio = _intern_short(self.extract_price(container, product_row))
         product['precio'] = precio
-        report['extraction_details']['precio'] = {
-            'value': precio,
-            'method_used': self._get_extraction_method_name(container, 'precio'),
-            'source_element': self._find_source_element_info(container, 'precio')
-        }
+        report['extraction_details']['precio'] = self._field_details(container, 'precio', precio, product_row)
         
-        cantidad = self.extract_quantity(container)
+        cantidad = _intern_short(self.extract_quantity(container, product_row))
         product['cantidad'] = cantidad
-        report['extraction_details']['cantidad'] = {
-            'value': cantidad,
-            'method_used': self._get_extraction_method_name(container, 'cantidad'),
-            'source_element': self._find_source_element_info(container, 'cantidad')
-        }
+        report['extraction_details']['cantidad'] = self._field_details(container, 'cantidad', cantidad, product_row)
         
-        sku = self.extract_sku(container)
+        sku = _intern_short(self.extract_sku(container, product_row))
         product['sku'] = sku
-        report['extraction_details']['sku'] = {
-            'value': sku,
-            'method_used': self._get_extraction_method_name(container, 'sku'),
-            'source_element': self._find_source_element_info(container, 'sku')
-        }
+        report['extraction_details']['sku'] = self._field_details(container, 'sku', sku, product_row)
         
         # ANÁLISIS DE ESTADO Y TEMPORAL
-        status_raw = self.extract_order_status(container)
+        status_raw = _intern_short(self.extract_order_status(container))
         order_id = self._extract_order_id(container)
         order_date = self._extract_order_date(container)
-        should_filter, filter_reason = self.should_filter_product(container, product)
+        # Reusar estado e ID ya extraídos ('' = ID buscado y no encontrado, evita repetir la búsqueda)
+        should_filter, filter_reason = self.should_filter_product(
+            container, product, status=status_raw, order_id=order_id or '')
         
         # NUEVO: Análisis temporal para productos "a acordar"
         temporal_classification = self._classify_temporal_product(status_raw, order_date)
@@ -853,14 +1134,12 @@ class MLProductExtractor:
             'raw_status_found': status_raw,
             'order_id_found': order_id,
             'order_date_found': order_date.strftime('%d/%m/%Y %H:%M') if order_date else None,
-            'status_elements_found': self._find_all_status_elements(container),
-            'filter_states_checked': self.filter_states.copy(),
-            'temporal_states_checked': self.temporal_states.copy(),
-            'known_reprogrammed_products': self.known_reprogrammed_products.copy(),
-            'known_delayed_products': self.known_delayed_products.copy(),
+            'status_elements_found': self._find_all_status_elements(container) if self.debug_enabled else [],
+            **self._checked_states_snapshot(),
             'should_filter': should_filter,
             'filter_reason': filter_reason,
-            'text_searched_in': container.get_text(separator=' ', strip=True)[:200] + '...'
+            'text_searched_in': (self._container_text(container)[:200] + '...'
+                                 if self.debug_enabled else DEBUG_DISABLED_NOTE)
         }
         
         # NUEVO: Reporte de análisis temporal
@@ -887,10 +1166,7 @@ class MLProductExtractor:
         # RESULTADO FINAL
         if should_filter:
             self.stats['filtered_out'] += 1
-            if filter_reason in self.stats['filter_reasons']:
-                self.stats['filter_reasons'][filter_reason] += 1
-            else:
-                self.stats['filter_reasons'][filter_reason] = 1
+            self.stats['filter_reasons'][filter_reason] += 1
             
             filtered_product = product.copy()
             filtered_product['filter_reason'] = filter_reason
@@ -903,21 +1179,23 @@ class MLProductExtractor:
                 'temporal_classification': temporal_classification
             }
             
-            logger.info(f"🚫 Producto filtrado por '{filter_reason}': {product['nombre'][:50]}...")
+            logger.debug("🚫 Producto filtrado por '%s': %.50s...", filter_reason, product['nombre'])
             self.debug_report.append(report)
             return None
         
         # Contar campos completos solo para productos no filtrados
+        stats = self.stats
+        completeness = stats['fields_completeness']
         for k, v in product.items():
-            if k in self.stats['fields_completeness'] and v:
-                self.stats['fields_completeness'][k] += 1
+            if v and k in completeness:
+                completeness[k] += 1
                 
         if product['nombre'] and product['precio']:
-            self.stats['successfully_extracted'] += 1
+            stats['successfully_extracted'] += 1
             
             # NUEVO: Clasificar y contar por tipo
             if is_urgent:
-                self.stats['urgent_count'] += 1
+                stats['urgent_count'] += 1
                 self.urgent_products.append(product)
                 report['final_result'] = {
                     'action': 'ACCEPTED_URGENT',
@@ -926,9 +1204,9 @@ class MLProductExtractor:
                     'section': 'URGENTES',
                     'temporal_classification': temporal_classification
                 }
-                logger.info(f"🔴 Producto URGENTE: {product['nombre'][:50]}...")
+                logger.debug("🔴 Producto URGENTE: %.50s...", product['nombre'])
             elif is_to_review:
-                self.stats['to_review_count'] += 1
+                stats['to_review_count'] += 1
                 self.to_review_products.append(product)
                 report['final_result'] = {
                     'action': 'ACCEPTED_TO_REVIEW',
@@ -937,9 +1215,9 @@ class MLProductExtractor:
                     'section': 'RETIROS A REVISAR',
                     'temporal_classification': temporal_classification
                 }
-                logger.info(f"🟡 Producto A REVISAR: {product['nombre'][:50]}...")
+                logger.debug("🟡 Producto A REVISAR: %.50s...", product['nombre'])
             else:
-                self.stats['normal_count'] += 1
+                stats['normal_count'] += 1
                 self.products.append(product)
                 report['final_result'] = {
                     'action': 'ACCEPTED_NORMAL',
@@ -948,7 +1226,7 @@ class MLProductExtractor:
                     'section': 'NORMALES',
                     'temporal_classification': temporal_classification
                 }
-                logger.info(f"✅ Producto normal: {product['nombre'][:50]}...")
+                logger.debug("✅ Producto normal: %.50s...", product['nombre'])
             
             self.debug_report.append(report)
             return product
@@ -965,33 +1243,21 @@ class MLProductExtractor:
 
     def _get_extraction_method_name(self, container, field_type):
         """Determina qué método se usó para extraer cada campo"""
-        if field_type == 'nombre':
-            return "extract_product_name -> label class or longest text"
-        elif field_type == 'link':
-            return "extract_product_link -> redirect-row href or articulo.mercadolibre"
-        elif field_type == 'imagen':
-            return "extract_product_image -> sc-product-picture img src"
-        elif field_type == 'precio':
-            return "extract_price -> price-container or $ pattern"
-        elif field_type == 'cantidad':
-            return "extract_quantity -> unit class or 'unidad' text"
-        elif field_type == 'sku':
-            return "extract_sku -> sku class or 'SKU:' text"
-        return "unknown"
-
-    def _find_source_element_info(self, container, field_type):
+        return EXTRACTION_METHOD_NAMES.get(field_type, "unknown")
+
+    def _find_source_element_info(self, container, field_type, product_row=None):
         """Encuentra información sobre el elemento fuente"""
+        if product_row is None:
+            product_row = self._get_product_row(container)
         if field_type == 'nombre':
-            product_row = container.find(class_=re.compile('sc-product-row')) or container
-            desc = product_row.find(class_=re.compile(r'description-container'))
+            desc = self._find_class_part(product_row, 'description-container')
             if desc:
-                label = desc.find(class_=re.compile('label'))
+                label = self._find_class_part(desc, 'label')
                 if label:
                     return f"Found in: {label.name} with class='{' '.join(label.get('class', []))}'"
             return "Not found or fallback to longest text"
         elif field_type == 'precio':
-            product_row = container.find(class_=re.compile('sc-product-row')) or container
-            price_el = product_row.find(class_=re.compile('price'))
+            price_el = self._find_class_part(product_row, 'price')
             if price_el:
                 return f"Found in: {price_el.name} with class='{' '.join(price_el.get('class', []))}'"
             return "Not found in price elements, searched in text"
@@ -1001,7 +1267,7 @@ class MLProductExtractor:
         """Encuentra todos los elementos de estado en el contenedor"""
         status_elements = []
         
-        status_classes = container.find_all(class_=re.compile('status'))
+        status_classes = container.find_all(class_=RE_STATUS_CLASS)
         for el in status_classes:
             status_elements.append({
                 'element': el.name,
@@ -1009,7 +1275,9 @@ class MLProductExtractor:
                 'text': el.get_text(strip=True)
             })
         
-        specific_status = container.find_all(class_='sc-status-action-row__status')
+        # Los estados específicos de ML ya están entre los anteriores (su clase contiene 'status')
+        specific_status = [el for el in status_classes
+                           if 'sc-status-action-row__status' in (el.get('class') or ())]
         for el in specific_status:
             status_elements.append({
                 'element': el.name,
@@ -1037,51 +1305,40 @@ class MLProductExtractor:
         if 'view-source' in file_path.name:
             raise ValueError("Archivo 'view-source' detectado. Guardá con Ctrl+S la página completa.")
         soup = self.load_html(file_path)
+        self._states_snapshot = None
 
         # Buscar contenedores row-card-container
-        order_containers = soup.find_all(class_='row-card-container')
-        if not order_containers:
-            order_containers = soup.find_all(class_=re.compile('row-card-container'))
+        order_containers = self._find_all_class(soup, 'row-card-container', RE_ROW_CARD)
         
         logger.info(f"📦 Contenedores row-card-container encontrados: {len(order_containers)}")
         
         if not order_containers:
             logger.info("No se encontraron row-card-container, buscando contenedores sc-row...")
             # NUEVO: Buscar directamente contenedores sc-row que son los principales
-            sc_rows = soup.find_all(class_='sc-row')
-            if not sc_rows:
-                sc_rows = soup.find_all(class_=re.compile('sc-row'))
+            sc_rows = self._find_all_class(soup, 'sc-row', RE_SC_ROW)
             
             if sc_rows:
                 logger.info(f"📦 Contenedores sc-row encontrados: {len(sc_rows)}")
                 order_containers = sc_rows
             else:
                 logger.info("No se encontraron sc-row, buscando contenedores alternativos...")
-                potential_containers = soup.find_all('div')
+                # Divs que contienen un estado y una fila de producto
+                order_containers = self._divs_containing(
+                    soup, soup.find_all(class_=RE_STATUS_ACTION), soup.find_all(class_=RE_PRODUCT_ROW))
                 
-                for container in potential_containers:
-                    has_status = container.find(class_=re.compile('sc-status-action-row__status'))
-                    has_product = container.find(class_=re.compile('sc-product-row'))
-                    
-                    if has_status and has_product:
-                        order_containers.append(container)
-                        status_text = has_status.get_text(strip=True)
+                if logger.isEnabledFor(logging.DEBUG):
+                    for container in order_containers:
+                        status_text = self._find_class_part(container, 'sc-status-action-row__status').get_text(strip=True)
                         logger.debug(f"Contenedor alternativo encontrado - Estado: '{status_text}'")
         
         if not order_containers:
             logger.info("No se encontraron contenedores completos, usando estrategia de productos individuales")
-            rows = soup.find_all(class_='sc-product-row')
-            if not rows:
-                rows = soup.find_all(class_=re.compile('sc-product-row'))
+            rows = self._find_all_class(soup, 'sc-product-row', RE_PRODUCT_ROW)
             if not rows:
-                rows = soup.find_all(attrs={'data-testid': re.compile('product-row')})
+                rows = soup.find_all(attrs={'data-testid': RE_PRODUCT_ROW_TESTID})
             
             if not rows:
-                cand = []
-                for div in soup.find_all('div'):
-                    if div.find('img') and div.find(text=re.compile(r'\$\s*\d+')):
-                        cand.append(div)
-                rows = cand
+                rows = self._divs_containing(soup, soup.find_all('img'), soup.find_all(text=RE_PRICE_TEXT))
             order_containers = rows
 
         self.stats['total_found'] = len(order_containers)
@@ -1089,20 +1346,24 @@ class MLProductExtractor:
         
         if not order_containers:
             self._diagnose_structure(soup)
+        self._raw_html = None
 
+        # Las búsquedas de este log son solo para depurar: no se hacen si DEBUG está apagado
+        log_containers = logger.isEnabledFor(logging.DEBUG)
         for i, container in enumerate(order_containers, 1):
             try:
-                status_element = container.find(class_=re.compile('sc-status-action-row__status'))
-                product_element = container.find(class_=re.compile('sc-product-row'))
-                
-                status_text = status_element.get_text(strip=True) if status_element else "Sin estado"
-                product_name = ""
-                if product_element:
-                    label_el = product_element.find(class_=re.compile('label'))
-                    if label_el:
-                        product_name = label_el.get_text(strip=True)[:30]
-                
-                logger.debug(f"Contenedor {i}: Estado='{status_text}' | Producto='{product_name}...'")
+                if log_containers:
+                    status_element = self._find_class_part(container, 'sc-status-action-row__status')
+                    product_element = self._find_class_part(container, 'sc-product-row')
+                    
+                    status_text = status_element.get_text(strip=True) if status_element else "Sin estado"
+                    product_name = ""
+                    if product_element:
+                        label_el = self._find_class_part(product_element, 'label')
+                        if label_el:
+                            product_name = label_el.get_text(strip=True)[:30]
+                    
+                    logger.debug(f"Contenedor {i}: Estado='{status_text}' | Producto='{product_name}...'")
                 
                 p = self.extract_product(container)
                 # El producto ya se agregó a la lista correspondiente en extract_product
@@ -1116,13 +1377,45 @@ class MLProductExtractor:
         self._log_summary()
         return self.get_all_products_organized()
 
+    def _find_all_class(self, root, exact, pattern):
+        """
+        Elementos con la clase exacta `exact`; si no hay ninguno, los que matchean `pattern`.
+        Mismo resultado que find_all(class_=exact) con find_all(class_=pattern) de respaldo,
+        pero recorriendo el árbol una sola vez.
+        """
+        matches = root.find_all(class_=pattern)
+        exact_matches = [el for el in matches if exact in (el.get('class') or ())]
+        return exact_matches or matches
+
+    def _divs_containing(self, soup, *node_groups):
+        """
+        Divs de soup (en orden de documento) que contienen al menos un nodo de cada grupo.
+        Mismo resultado que filtrar soup.find_all('div') con div.find(...) por grupo, pero
+        subiendo por los ancestros de cada nodo en vez de buscar dentro de cada div.
+        """
+        common = None
+        for nodes in node_groups:
+            div_ids = set()  # id(): los Tag de bs4 se hashean serializándose
+            for node in nodes:
+                for parent in node.parents:
+                    if parent.name != 'div':
+                        continue
+                    if id(parent) in div_ids:
+                        break  # sus ancestros ya se agregaron desde otro nodo
+                    div_ids.add(id(parent))
+            common = div_ids if common is None else common & div_ids
+            if not common:
+                return []
+        return [div for div in soup.find_all('div') if id(div) in common]
+
     def _log_summary(self):
         logger.info("=== 📊 RESUMEN CON CLASIFICACIÓN TEMPORAL (FINES DE SEMANA) ===")
-        current_day = datetime.now().strftime('%A')
+        now = datetime.now()
+        current_day = now.strftime('%A')
         logger.info(f"🗓️  Día actual: {current_day}")
         logger.info(f"🕐 Umbral temporal usado: {self.temporal_threshold.strftime('%A %d/%m/%Y %H:%M')}")
         
-        if datetime.now().weekday() == 0:  # Lunes
+        if now.weekday() == 0:  # Lunes
             logger.info("📅 MODO LUNES: Urgentes = pedidos 'a acordar' desde el viernes 16:00")
         else:
             logger.info("📅 MODO NORMAL: Urgentes = pedidos 'a acordar' desde ayer 16:00")
@@ -1144,71 +1437,74 @@ class MLProductExtractor:
     def _diagnose_structure(self, soup):
         logger.info("=== 🔍 DIAGNÓSTICO HTML ===")
         
-        row_card_containers = soup.find_all(class_='row-card-container')
-        logger.info(f"row-card-container encontrados: {len(row_card_containers)}")
-        
-        prod_elems = soup.find_all(class_=re.compile('product', re.I))
-        logger.info(f"Elems con 'product' en clase: {len(prod_elems)}")
-        prices = soup.find_all(text=re.compile(r'\$\s*\d+'))
-        logger.info(f"Textos con $: {len(prices)}")
-        imgs = soup.find_all('img', src=re.compile('mlstatic'))
-        logger.info(f"Imágenes mlstatic: {len(imgs)}")
-        links = soup.find_all('a', href=re.compile('articulo.mercadolibre'))
-        logger.info(f"Links artículo: {len(links)}")
-        status_elems = soup.find_all(class_=re.compile('status'))
-        logger.info(f"Elementos con 'status': {len(status_elems)}")
-        
-        ml_status = soup.find_all(class_='sc-status-action-row__status')
+        # Un solo recorrido del árbol en lugar de un find_all por categoría
+        counts = Counter()
+        ml_status, ml_products, scripts = [], [], []
+        for el in soup.descendants:
+            if isinstance(el, NavigableString):
+                if RE_PRICE_TEXT.search(el):
+                    counts['prices'] += 1
+                continue
+            classes = el.get('class') or ()
+            if 'row-card-container' in classes:
+                counts['row_cards'] += 1
+            if 'sc-status-action-row__status' in classes:
+                ml_status.append(el)
+            if 'sc-product-row' in classes:
+                ml_products.append(el)
+            if any(RE_PRODUCT_CLASS.search(c) for c in classes):
+                counts['product_class'] += 1
+            if any(RE_STATUS_CLASS.search(c) for c in classes):
+                counts['status_class'] += 1
+            if el.name == 'img' and RE_MLSTATIC.search(el.get('src') or ''):
+                counts['mlstatic_imgs'] += 1
+            elif el.name == 'a' and RE_ARTICLE_LINK.search(el.get('href') or ''):
+                counts['article_links'] += 1
+            elif el.name == 'script':
+                scripts.append(el)
+        
+        logger.info(f"row-card-container encontrados: {counts['row_cards']}")
+        logger.info(f"Elems con 'product' en clase: {counts['product_class']}")
+        logger.info(f"Textos con $: {counts['prices']}")
+        logger.info(f"Imágenes mlstatic: {counts['mlstatic_imgs']}")
+        logger.info(f"Links artículo: {counts['article_links']}")
+        logger.info(f"Elementos con 'status': {counts['status_class']}")
+        
         logger.info(f"Estados ML HTML encontrados: {len(ml_status)}")
         if ml_status:
             for i, status in enumerate(ml_status[:5]):
                 logger.info(f"  Estado HTML {i+1}: '{status.get_text(strip=True)}'")
         
-        ml_products = soup.find_all(class_='sc-product-row')
         logger.info(f"Productos ML encontrados: {len(ml_products)}")
         
-        containers_with_both = 0
-        all_divs = soup.find_all('div')
-        for div in all_divs:
-            has_status = div.find(class_='sc-status-action-row__status')
-            has_product = div.find(class_='sc-product-row')
-            if has_status and has_product:
-                containers_with_both += 1
-                if containers_with_both <= 3:
-                    status_text = has_status.get_text(strip=True)
-                    logger.info(f"  Contenedor completo {containers_with_both}: Estado='{status_text}'")
+        complete_containers = self._divs_containing(soup, ml_status, ml_products)
+        for i, div in enumerate(complete_containers[:3], 1):
+            status_text = div.find(class_='sc-status-action-row__status').get_text(strip=True)
+            logger.info(f"  Contenedor completo {i}: Estado='{status_text}'")
         
-        logger.info(f"Contenedores con estado Y producto: {containers_with_both}")
+        logger.info(f"Contenedores con estado Y producto: {len(complete_containers)}")
         
         # NUEVO: Diagnóstico de fechas
-        date_patterns = [
-            r'\d{1,2}\s+(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)',
-            r'\d{1,2}\s+(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)\s+\d{4}',
-            r'\d{1,2}\s+(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)\s+\d{1,2}:\d{2}'
-        ]
-        
-        html_content = str(soup)
-        date_matches = 0
-        for pattern in date_patterns:
-            matches = re.findall(pattern, html_content, re.I)
-            date_matches += len(matches)
-            if matches:
-                logger.info(f"Fechas encontradas con patrón '{pattern}': {len(matches)}")
-                for i, match in enumerate(matches[:3]):
-                    logger.info(f"  Fecha {i+1}: {match}")
-        
-        logger.info(f"Total patrones de fecha encontrados: {date_matches}")
+        # Sobre el HTML crudo ya leído (no hace falta volver a serializar el árbol), en una sola pasada
+        html_content = self._raw_html if self._raw_html is not None else str(soup)
+        matches = list(RE_DIAG_DATE.finditer(html_content))
+        if matches:
+            with_year = sum(1 for m in matches if m.group('year'))
+            with_time = sum(1 for m in matches if m.group('time'))
+            logger.info(f"Fechas encontradas: {len(matches)} (con año: {with_year}, con hora: {with_time})")
+            for i, match in enumerate(matches[:3]):
+                logger.info(f"  Fecha {i+1}: {match.group(0)}")
+        
+        logger.info(f"Total patrones de fecha encontrados: {len(matches)}")
         
-        scripts = soup.find_all('script')
         json_status_count = 0
         logger.info(f"Scripts encontrados: {len(scripts)}")
         
         for script in scripts:
             if script.string:
-                status_matches = re.findall(r'"status"\s*:\s*"([^"]*)"', script.string, re.I)
-                for match in status_matches:
+                for match in RE_JSON_STATUS.findall(script.string):
                     # MEJORADO: Buscar más patrones de filtrado
-                    if any(filter_word in match.lower() for filter_word in ['reprogramado', 'cancelad', 'devuelt', 'reembolsad', 'acordar', 'acuerda']):
+                    if RE_DIAG_FILTER_WORDS.search(match):
                         json_status_count += 1
                         logger.info(f"  Estado JSON {json_status_count}: {match}")
                         if json_status_count >= 3:
@@ -1220,142 +1516,150 @@ class MLProductExtractor:
 
     def save_debug_report(self, dest):
         """Genera un reporte detallado en TXT de todo el proceso de extracción"""
-        report_lines = [
-            "=" * 80,
-            "REPORTE DETALLADO DE EXTRACCIÓN - MERCADO LIBRE CON LÓGICA TEMPORAL",
-            "=" * 80,
-            f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}",
-            f"Umbral temporal usado: {self.temporal_threshold.strftime('%d/%m/%Y %H:%M')}",
-            f"Total contenedores procesados: {len(self.debug_report)}",
-            f"Productos urgentes: {self.stats['urgent_count']}",
-            f"Productos normales: {self.stats['normal_count']}",
-            f"Productos a revisar: {self.stats['to_review_count']}",
-            f"Productos filtrados: {self.stats['filtered_out']}",
-            "",
-            "LÓGICA TEMPORAL CON FINES DE SEMANA:",
-            "-" * 40,
-            f"- Día actual: {datetime.now().strftime('%A %d/%m/%Y')} (día {datetime.now().weekday() + 1} de la semana)",
-            f"- Umbral calculado: {self.temporal_threshold.strftime('%A %d/%m/%Y %H:%M')}",
-            "- REGLAS:",
-            "  * LUNES: Urgentes = pedidos 'a acordar' después del VIERNES 16:00",
-            "  * MARTES-VIERNES: Urgentes = pedidos 'a acordar' después de AYER 16:00", 
-            "  * Productos 'a acordar' antes del umbral → A REVISAR",
-            "",
-            "FILTROS ACTIVOS:",
-            "-" * 20
-        ]
-        
-        for filter_state in self.filter_states:
-            report_lines.append(f"- {filter_state}")
+        now = datetime.now()
+        now_day = now.strftime('%A %d/%m/%Y')
+        # Se escribe por bloques a medida que se genera (no se arma el reporte entero en memoria)
+        with dest.open('w', encoding='utf-8') as f:
+            report_lines = [
+                "=" * 80,
+                "REPORTE DETALLADO DE EXTRACCIÓN - MERCADO LIBRE CON LÓGICA TEMPORAL",
+                "=" * 80,
+                f"Fecha: {now.strftime('%d/%m/%Y %H:%M:%S')}",
+                f"Umbral temporal usado: {self.temporal_threshold.strftime('%d/%m/%Y %H:%M')}",
+                f"Total contenedores procesados: {len(self.debug_report)}",
+                f"Productos urgentes: {self.stats['urgent_count']}",
+                f"Productos normales: {self.stats['normal_count']}",
+                f"Productos a revisar: {self.stats['to_review_count']}",
+                f"Productos filtrados: {self.stats['filtered_out']}",
+                "",
+                "LÓGICA TEMPORAL CON FINES DE SEMANA:",
+                "-" * 40,
+                f"- Día actual: {now_day} (día {now.weekday() + 1} de la semana)",
+                f"- Umbral calculado: {self.temporal_threshold.strftime('%A %d/%m/%Y %H:%M')}",
+                "- REGLAS:",
+                "  * LUNES: Urgentes = pedidos 'a acordar' después del VIERNES 16:00",
+                "  * MARTES-VIERNES: Urgentes = pedidos 'a acordar' después de AYER 16:00", 
+                "  * Productos 'a acordar' antes del umbral → A REVISAR",
+                "",
+                "FILTROS ACTIVOS:",
+                "-" * 20
+            ]
         
-        report_lines.extend([
-            "",
-            "DETALLE POR CONTENEDOR:",
-            "=" * 50
-        ])
+            for filter_state in self.filter_states:
+                report_lines.append(f"- {filter_state}")
         
-        for report in self.debug_report:
             report_lines.extend([
                 "",
-                f"CONTENEDOR #{report['container_id']}",
-                "-" * 30,
-                f"Clases del contenedor: {', '.join(report['html_classes']) if report['html_classes'] else 'Sin clases'}",
-                "",
-                "EXTRACCIÓN DE DATOS:",
-                ""
+                "DETALLE POR CONTENEDOR:",
+                "=" * 50
             ])
+        
+            for report in self.debug_report:
+                # Volcar lo acumulado: en memoria queda solo el bloque del contenedor actual
+                f.write("\n".join(report_lines) + "\n")
+                report_lines.clear()
+                report_lines.extend([
+                    "",
+                    f"CONTENEDOR #{report['container_id']}",
+                    "-" * 30,
+                    f"Clases del contenedor: {', '.join(report['html_classes']) if report['html_classes'] else 'Sin clases'}",
+                    "",
+                    "EXTRACCIÓN DE DATOS:",
+                    ""
+                ])
             
-            for field, details in report['extraction_details'].items():
+                for field, details in report['extraction_details'].items():
+                    report_lines.extend([
+                        f"  {field.upper()}:",
+                        f"    Valor extraído: '{details['value']}'",
+                        f"    Método usado: {details['method_used']}",
+                        f"    Elemento fuente: {details['source_element']}",
+                        ""
+                    ])
+            
+                status_info = report['status_detection']
                 report_lines.extend([
-                    f"  {field.upper()}:",
-                    f"    Valor extraído: '{details['value']}'",
-                    f"    Método usado: {details['method_used']}",
-                    f"    Elemento fuente: {details['source_element']}",
+                    "DETECCIÓN DE ESTADO:",
+                    f"  Estado en bruto encontrado: '{status_info['raw_status_found']}'",
+                    f"  ID de pedido encontrado: '{status_info.get('order_id_found', 'No encontrado')}'",
+                    f"  Fecha de pedido encontrada: '{status_info.get('order_date_found', 'No encontrada')}'",
+                    f"  Elementos de estado encontrados: {len(status_info['status_elements_found'])}",
                     ""
                 ])
             
-            status_info = report['status_detection']
-            report_lines.extend([
-                "DETECCIÓN DE ESTADO:",
-                f"  Estado en bruto encontrado: '{status_info['raw_status_found']}'",
-                f"  ID de pedido encontrado: '{status_info.get('order_id_found', 'No encontrado')}'",
-                f"  Fecha de pedido encontrada: '{status_info.get('order_date_found', 'No encontrada')}'",
-                f"  Elementos de estado encontrados: {len(status_info['status_elements_found'])}",
-                ""
-            ])
+                if status_info['status_elements_found']:
+                    for i, elem in enumerate(status_info['status_elements_found'], 1):
+                        report_lines.append(f"    Elemento {i}: <{elem['element']}> clases={elem['classes']} texto='{elem['text']}'")
+                    report_lines.append("")
             
-            if status_info['status_elements_found']:
-                for i, elem in enumerate(status_info['status_elements_found'], 1):
-                    report_lines.append(f"    Elemento {i}: <{elem['element']}> clases={elem['classes']} texto='{elem['text']}'")
-                report_lines.append("")
+                # NUEVO: Análisis temporal
+                temporal_info = report['temporal_analysis']
+                report_lines.extend([
+                    "ANÁLISIS TEMPORAL (CON FINES DE SEMANA):",
+                    f"  Día actual: {now_day}",
+                    f"  Umbral temporal: {temporal_info['temporal_threshold']}",
+                    f"  Fecha del pedido: {temporal_info.get('order_date', 'No encontrada')}",
+                    f"  ¿Es estado temporal?: {temporal_info['is_temporal_state']}",
+                    f"  Clasificación temporal: {temporal_info.get('temporal_classification', 'No aplica')}",
+                    f"  Resultado comparación: {temporal_info.get('comparison_result', 'No aplica')}",
+                    ""
+                ])
             
-            # NUEVO: Análisis temporal
-            temporal_info = report['temporal_analysis']
-            report_lines.extend([
-                "ANÁLISIS TEMPORAL (CON FINES DE SEMANA):",
-                f"  Día actual: {datetime.now().strftime('%A %d/%m/%Y')}",
-                f"  Umbral temporal: {temporal_info['temporal_threshold']}",
-                f"  Fecha del pedido: {temporal_info.get('order_date', 'No encontrada')}",
-                f"  ¿Es estado temporal?: {temporal_info['is_temporal_state']}",
-                f"  Clasificación temporal: {temporal_info.get('temporal_classification', 'No aplica')}",
-                f"  Resultado comparación: {temporal_info.get('comparison_result', 'No aplica')}",
-                ""
-            ])
+                report_lines.extend([
+                    f"  Filtros verificados: {', '.join(status_info['filter_states_checked'])}",
+                    f"  Estados temporales verificados: {', '.join(status_info.get('temporal_states_checked', []))}",
+                    f"  ¿Debe filtrarse?: {status_info['should_filter']}",
+                    f"  Razón del filtro: {status_info['filter_reason']}",
+                    "",
+                    f"  Texto completo del contenedor (primeros 200 chars):",
+                    f"    '{status_info['text_searched_in']}'",
+                    ""
+                ])
             
+                result = report['final_result']
+                report_lines.extend([
+                    "RESULTADO FINAL:",
+                    f"  Acción: {result['action']}",
+                    f"  Razón: {result['reason']}",
+                    f"  Incluido en salida: {result['included_in_output']}",
+                    f"  Sección: {result.get('section', 'N/A')}",
+                    f"  Clasificación temporal: {result.get('temporal_classification', 'N/A')}",
+                    "",
+                    "=" * 50
+                ])
+        
+            # Una sola pasada para contar las acciones finales de todos los contenedores
+            action_counts = Counter(r['final_result']['action'] for r in self.debug_report)
             report_lines.extend([
-                f"  Filtros verificados: {', '.join(status_info['filter_states_checked'])}",
-                f"  Estados temporales verificados: {', '.join(status_info.get('temporal_states_checked', []))}",
-                f"  ¿Debe filtrarse?: {status_info['should_filter']}",
-                f"  Razón del filtro: {status_info['filter_reason']}",
                 "",
-                f"  Texto completo del contenedor (primeros 200 chars):",
-                f"    '{status_info['text_searched_in']}'",
-                ""
-            ])
-            
-            result = report['final_result']
-            report_lines.extend([
-                "RESULTADO FINAL:",
-                f"  Acción: {result['action']}",
-                f"  Razón: {result['reason']}",
-                f"  Incluido en salida: {result['included_in_output']}",
-                f"  Sección: {result.get('section', 'N/A')}",
-                f"  Clasificación temporal: {result.get('temporal_classification', 'N/A')}",
+                "RESUMEN ESTADÍSTICO:",
+                "=" * 30,
+                f"Total contenedores procesados: {len(self.debug_report)}",
+                f"Productos urgentes: {action_counts['ACCEPTED_URGENT']}",
+                f"Productos normales: {action_counts['ACCEPTED_NORMAL']}",
+                f"Productos a revisar: {action_counts['ACCEPTED_TO_REVIEW']}",
+                f"Productos filtrados: {action_counts['FILTERED']}",
+                f"Productos rechazados (incompletos): {action_counts['REJECTED']}",
                 "",
-                "=" * 50
+                "RAZONES DE FILTRADO:",
             ])
         
-        report_lines.extend([
-            "",
-            "RESUMEN ESTADÍSTICO:",
-            "=" * 30,
-            f"Total contenedores procesados: {len(self.debug_report)}",
-            f"Productos urgentes: {len([r for r in self.debug_report if r['final_result']['action'] == 'ACCEPTED_URGENT'])}",
-            f"Productos normales: {len([r for r in self.debug_report if r['final_result']['action'] == 'ACCEPTED_NORMAL'])}",
-            f"Productos a revisar: {len([r for r in self.debug_report if r['final_result']['action'] == 'ACCEPTED_TO_REVIEW'])}",
-            f"Productos filtrados: {len([r for r in self.debug_report if r['final_result']['action'] == 'FILTERED'])}",
-            f"Productos rechazados (incompletos): {len([r for r in self.debug_report if r['final_result']['action'] == 'REJECTED'])}",
-            "",
-            "RAZONES DE FILTRADO:",
-        ])
-        
-        for reason, count in self.stats['filter_reasons'].items():
-            report_lines.append(f"  - {reason}: {count}")
-        
-        report_lines.extend([
-            "",
-            "COMPLETITUD DE CAMPOS:",
-            ""
-        ])
+            for reason, count in self.stats['filter_reasons'].items():
+                report_lines.append(f"  - {reason}: {count}")
         
-        total_products = self.stats['final_count']
-        if total_products > 0:
-            for field, count in self.stats['fields_completeness'].items():
-                percentage = (count / total_products) * 100
-                report_lines.append(f"  {field}: {count}/{total_products} ({percentage:.1f}%)")
+            report_lines.extend([
+                "",
+                "COMPLETITUD DE CAMPOS:",
+                ""
+            ])
         
-        report_content = "\n".join(report_lines)
-        dest.write_text(report_content, encoding='utf-8')
+            total_products = self.stats['final_count']
+            if total_products > 0:
+                for field, count in self.stats['fields_completeness'].items():
+                    percentage = (count / total_products) * 100
+                    report_lines.append(f"  {field}: {count}/{total_products} ({percentage:.1f}%)")
+            
+            f.write("\n".join(report_lines))
         logger.info(f"📋 Reporte detallado guardado en: {dest}")
         return dest
 
@@ -1381,19 +1685,31 @@ class MLProductExtractor:
             'productos_a_revisar': organized_products['to_review'],
             'productos_filtrados': self.filtered_products
         }
-        dest.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+        dest.write_bytes(dumps_json(data))
         logger.info(f"JSON guardado en: {dest}")
         return dest
 
 
 # ===================== PDF MEJORADO CON SECCIONES ===================== #
+# Secciones del PDF en orden: (clave, título, subtítulo, nombre por defecto, texto del banner B/N)
+# Sin banner (None) el producto lleva solo un marco fino.
+PDF_SECTIONS = (
+    ('urgent', "PRODUCTOS URGENTES",
+     "(A acordar después de ayer 16:00 - Requieren atención inmediata)", "Producto Urgente", "URGENTE"),
+    ('normal', "PRODUCTOS NORMALES", None, "Producto", None),
+    ('to_review', "RETIROS A REVISAR",
+     "(A acordar antes de ayer 16:00 - Revisar estado con compradores)", "Producto a Revisar", "A REVISAR"),
+)
+
 class PDFGenerator:
     def __init__(self, organized_products):
         """
         organized_products: dict con keys 'urgent', 'normal', 'to_review'
         """
         # ---- Imports internos para que la clase sea autosuficiente ----
-        import logging, os, re, time, tempfile, requests
+        import io, logging, os, re, time, tempfile, hashlib, requests
+        from functools import lru_cache
+        from concurrent.futures import ThreadPoolExecutor
         from reportlab.lib import colors
         from reportlab.lib.units import mm
         from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -1406,11 +1722,14 @@ class PDFGenerator:
         from reportlab.pdfbase.ttfonts import TTFont
 
         # Referencias a módulos/objs usados en métodos
+        self.io = io
         self.os = os
         self.re = re
         self.time = time
         self.tempfile = tempfile
+        self.hashlib = hashlib
         self.requests = requests
+        self.ThreadPoolExecutor = ThreadPoolExecutor
 
         self.colors = colors
         self.mm = mm
@@ -1435,6 +1754,20 @@ class PDFGenerator:
         self.image_downloader = self._init_image_downloader()
         self.logger = logging.getLogger(__name__)
 
+        # Cache acotado de descargas (URL -> archivo local); por instancia para que las rutas
+        # no sobrevivan a la limpieza de temporales de generate()
+        self._fetch_image = lru_cache(maxsize=512)(self._fetch_image)
+        # Mismo archivo y tamaño -> mismos bytes PNG B/N (productos repetidos no se reprocesan)
+        self._process_image_for_thermal = lru_cache(maxsize=512)(self._process_image_for_thermal)
+        # Idem para la versión reducida en color (cuando no se usa el modo B/N)
+        self._downscale_image = lru_cache(maxsize=512)(self._downscale_image)
+        self.download_workers = 16    # hilos para descargar imágenes en paralelo
+        self.download_timeout = (3.05, 15)        # (conexión, lectura): host caído falla en ~3 s
+        self.max_image_bytes = 10 * 1024 * 1024   # se corta la descarga de imágenes absurdas
+        # Cache en disco entre corridas (URL -> archivo); None si no se pudo crear
+        self.image_cache_days = 30    # se borran las imágenes no usadas en este plazo
+        self.image_cache_dir = self._init_image_cache_dir()
+
         # Ajustes para impresión térmica B/N
         self.thermal_bw = True        # activar procesado para B/N
         self.thermal_dpi = 203        # 203 o 300
@@ -1481,13 +1814,123 @@ class PDFGenerator:
 
         # Temporales a limpiar tras doc.build()
         self._temp_files = []
+        # Descargas en curso (URL normalizada -> Future) mientras se arma el PDF
+        self._pending_images = {}
+
+        # Estilos fijos: se arman una vez (dependen de las fuentes registradas arriba)
+        self._build_styles()
+
+    # ---------------------------------------
+    # Estilos reutilizables
+    # ---------------------------------------
+    def _build_styles(self):
+        """Crea los ParagraphStyle/TableStyle que se comparten entre todos los productos."""
+        # ---- Estilos de datos (20% más grandes, "peso medio" si hay Roboto-Medium) ----
+        self._label_style = self.ParagraphStyle(
+            'data_label',
+            fontName=self.data_font_name,
+            fontSize=self.data_font_size,
+            leading=self.data_leading,
+        )
+        self._value_style = self.ParagraphStyle(
+            'data_value',
+            fontName=self.data_font_name,
+            fontSize=self.data_font_size,
+            leading=self.data_leading,
+        )
+        # "X Unidades" en NEGRITA siempre que sea > 1
+        self._qty_bold_style = self.ParagraphStyle(
+            'qty_bold',
+            fontName=self.bold_font_name,            # Roboto-Bold si disponible, si no Helvetica-Bold
+            fontSize=int(round(14 * 1.2)),           # mantener énfasis de tamaño existente
+            leading=int(round(16 * 1.2)),
+            alignment=0  # Alineación izquierda para consistencia con otros valores
+        )
+        self._placeholder_style = self.ParagraphStyle(
+            'ph',
+            fontName=self.data_font_name,      # usar mismo font
+            fontSize=self.data_font_size,      # consistente con datos
+            alignment=self.TA_CENTER,
+            textColor=self.colors.black,
+            leading=self.data_leading
+        )
+
+        # Estilo base de la tabla de datos
+        data_style_cmds = [
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ]
+        self._data_tbl_style = self.TableStyle(data_style_cmds)
+        # Si cantidad >= 2: estilo especial para destacar
+        self._data_tbl_style_multi = self.TableStyle(data_style_cmds + [
+            ('ALIGN', (1, 1), (1, 1), 'LEFT'),        # Solo el valor "X Unidades" alineado a la izquierda
+            ('VALIGN', (0, 1), (1, 1), 'MIDDLE'),     # Centrar verticalmente
+            ('TOPPADDING', (0, 1), (1, 1), 4),        # Más padding superior
+            ('BOTTOMPADDING', (0, 1), (1, 1), 4),     # Más padding inferior
+        ])
+
+        # Tabla principal (imagen + datos) sin padding (lo maneja el wrapper)
+        self._main_tbl_style = self.TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+        ])
+        # Normal: marco fino B/N
+        self._normal_box_style = self.TableStyle([
+            ('BOX', (0, 0), (-1, -1), 1, self.colors.black),
+            ('BACKGROUND', (0, 0), (-1, -1), self.colors.white),
+        ])
+        self._placeholder_tbl_style = self.TableStyle([
+            ('BOX', (0, 0), (-1, -1), 1.2, self.colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BACKGROUND', (0, 0), (-1, -1), self.colors.white),
+        ])
+        self._banner_tbl_style = self.TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), self.colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING',  (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING',   (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING',(0, 0), (-1, -1), 0),
+        ])
 
     # ---------------------------------------
     # Sesión HTTP para imágenes
     # ---------------------------------------
     def _init_image_downloader(self):
         """Inicializa el descargador de imágenes mejorado."""
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
         session = self.requests.Session()
+        # Pool de conexiones keep-alive: todas las imágenes vienen de los mismos hosts de mlstatic,
+        # así se evita un handshake TCP+TLS por imagen. Los reintentos (timeouts, errores de
+        # conexión, 5xx/429) los hace urllib3 con espera creciente entre intentos.
+        retry_opts = dict(
+            total=3,
+            backoff_factor=0.5,   # 0.5 s, 1 s, 2 s...
+            status_forcelist=[408, 425, 429, 500, 502, 503, 504],
+            allowed_methods=['GET'],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        try:
+            # urllib3 >= 2: azar en la espera para que los hilos no reintenten todos a la vez
+            retry = Retry(backoff_jitter=0.25, **retry_opts)
+        except TypeError:
+            retry = Retry(**retry_opts)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
         session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
@@ -1501,6 +1944,31 @@ class PDFGenerator:
         })
         return session
 
+    def _init_image_cache_dir(self):
+        """Crea (o reutiliza) el directorio de imágenes cacheadas y purga las viejas."""
+        try:
+            cache_dir = get_cache_directory() / "imagenes"
+            cache_dir.mkdir(exist_ok=True)
+            max_age = self.image_cache_days * 24 * 3600
+            now = self.time.time()
+            for path in cache_dir.iterdir():
+                try:
+                    if now - path.stat().st_mtime > max_age:
+                        path.unlink()
+                except OSError:
+                    pass
+            return cache_dir
+        except Exception as e:
+            self.logger.warning(f"Cache de imágenes deshabilitado: {e}")
+            return None
+
+    def _image_cache_path(self, url):
+        """Ruta en el cache de disco para la URL (nombre = hash de la URL)."""
+        if self.image_cache_dir is None:
+            return None
+        digest = self.hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+        return str(self.image_cache_dir / f"{digest}.jpg")
+
     def _register_temp(self, path):
         """Registra un archivo temporal para borrarlo al final."""
         if path and self.os.path.exists(path):
@@ -1515,6 +1983,10 @@ class PDFGenerator:
             except Exception:
                 pass
         self._temp_files.clear()
+        # Las rutas memoizadas apuntan a temporales que ya no existen
+        self._fetch_image.cache_clear()
+        self._process_image_for_thermal.cache_clear()
+        self._downscale_image.cache_clear()
 
     # ---------------------------------------
     # Utilidades para URLs de Mercado Libre
@@ -1523,29 +1995,23 @@ class PDFGenerator:
         """Limpia variantes de ML para mejorar compatibilidad."""
         if not url:
             return url
-        try:
-            if '.webp' in url:
-                url = url.replace('.webp', '.jpg')
-            if '-O.jpg' in url:
-                url = url.replace('-O.jpg', '-I.jpg')
-            return url
-        except Exception:
-            return url
+        # Una pasada: "-O.jpg"/"-O.webp" -> "-I.jpg" y cualquier otro ".webp" -> ".jpg"
+        return RE_ML_IMG_NORMALIZE.sub(lambda m: '-I.jpg' if m.group(0).startswith('-O') else '.jpg', url)
 
     def _try_image_variants(self, url):
         """Genera variantes de la URL a probar."""
-        variants = [url]
-        if 'mlstatic.com' in url:
-            base_url = url
-            variants.extend([
-                base_url.replace('-O.jpg', '-I.jpg'),
-                base_url.replace('-O.jpg', '-S.jpg'),
-                base_url.replace('-O.webp', '-I.jpg'),
-                base_url.replace('-O.webp', '-S.jpg'),
-                base_url.replace('.webp', '.jpg'),
-            ])
+        if 'mlstatic.com' not in url:
+            return (url,)
+        variants = (
+            url,
+            url.replace('-O.jpg', '-I.jpg'),
+            url.replace('-O.jpg', '-S.jpg'),
+            url.replace('-O.webp', '-I.jpg'),
+            url.replace('-O.webp', '-S.jpg'),
+            url.replace('.webp', '.jpg'),
+        )
         # eliminar duplicados preservando orden
-        return list(dict.fromkeys(variants))
+        return tuple(dict.fromkeys(variants))
 
     # ---------------------------------------
     # Procesado para térmica B/N (Pillow)
@@ -1558,7 +2024,8 @@ class PDFGenerator:
         - realce de bordes (mezcla)
         - 1-bit con dithering (o umbral fijo)
         - redimensionado al ancho objetivo según DPI
-        Devuelve la ruta de un PNG temporal listo para ReportLab.
+        Devuelve los bytes del PNG resultante (en memoria, sin temporal en disco),
+        o la ruta original si el procesado falla (None si era un archivo roto del cache).
         """
         try:
             from PIL import Image, ImageOps, ImageEnhance, ImageFilter
@@ -1569,6 +2036,8 @@ class PDFGenerator:
             target_w_px = max(140, int((width_pt / 72.0) * dpi))
 
             with Image.open(src_path) as im:
+                # JPEG: decodificar directamente a escala reducida (1/2, 1/4, 1/8) sin bajar del objetivo
+                im.draft('RGB', (target_w_px, target_w_px))
                 im = im.convert('RGB')
                 # Redimensionar manteniendo aspecto antes de binarizar
                 im.thumbnail((target_w_px, 10_000), Image.LANCZOS)
@@ -1593,19 +2062,187 @@ class PDFGenerator:
                 # Borde negro fino para reforzar contornos generales
                 bw = ImageOps.expand(bw, border=1, fill=0)
 
-                out_path = self.tempfile.NamedTemporaryFile(delete=False, suffix='.png').name
-                bw.save(out_path, 'PNG')
-                self._register_temp(out_path)
-                return out_path
+                buf = self.io.BytesIO()
+                bw.save(buf, 'PNG')
+                return buf.getvalue()
 
         except Exception as e:
             self.logger.warning(f"Procesado B/N falló, uso original. Detalle: {e}")
+            # Solo si el archivo en sí está roto se descarta del cache (y va placeholder)
+            if not self._is_valid_image(src_path) and self._discard_cached_image(src_path):
+                return None
             return src_path
 
+    def _downscale_image(self, src_path, width_pt, height_pt):
+        """
+        Reduce la imagen al tamaño en que se imprime (según DPI) y la recodifica como JPEG.
+        Las fotos de ML llegan a 1200px y se muestran a ~27 mm: así el PDF no embebe el original.
+        Devuelve los bytes del JPEG, o la ruta original si ya es chica o si falla
+        (None si era un archivo roto del cache).
+        """
+        try:
+            from PIL import Image
+            dpi = getattr(self, 'thermal_dpi', 203)
+            target_px = max(140, int((max(width_pt, height_pt) / 72.0) * dpi))
+
+            with Image.open(src_path) as im:
+                if max(im.size) <= target_px:
+                    return src_path
+                im.draft('RGB', (target_px, target_px))
+                if im.mode in ('RGBA', 'LA', 'PA') or (im.mode == 'P' and 'transparency' in im.info):
+                    # JPEG no tiene alfa: lo transparente va sobre blanco (convert('RGB') lo deja negro)
+                    rgba = im.convert('RGBA')
+                    im = Image.new('RGB', rgba.size, 'white')
+                    im.paste(rgba, mask=rgba.getchannel('A'))
+                else:
+                    im = im.convert('RGB')
+                im.thumbnail((target_px, target_px), Image.LANCZOS)
+                buf = self.io.BytesIO()
+                im.save(buf, 'JPEG', quality=85, optimize=True)
+                return buf.getvalue()
+
+        except Exception as e:
+            self.logger.warning(f"No se pudo reducir la imagen, uso original. Detalle: {e}")
+            # Solo si el archivo en sí está roto se descarta del cache (y va placeholder)
+            if not self._is_valid_image(src_path) and self._discard_cached_image(src_path):
+                return None
+            return src_path
+
+    def _is_valid_image(self, path):
+        """True si Pillow decodifica el archivo completo (descarta cuerpos truncados o que no son imagen)."""
+        try:
+            from PIL import Image
+            with Image.open(path) as im:
+                im.draft('RGB', (1, 1))  # JPEG: decodificar a 1/8 alcanza para detectar truncados
+                im.load()
+            return True
+        except Exception:
+            return False
+
+    def _discard_cached_image(self, path):
+        """
+        Borra del cache de disco un archivo que no se pudo usar, para que la próxima corrida
+        lo vuelva a descargar. Solo toca archivos del cache (nunca imágenes locales del usuario).
+        Devuelve True si el archivo era del cache.
+        """
+        if (not isinstance(path, str) or self.image_cache_dir is None
+                or self.os.path.dirname(path) != str(self.image_cache_dir)):
+            return False
+        try:
+            self.os.unlink(path)
+            self.logger.warning("Imagen del cache descartada: %s", path)
+        except OSError:
+            pass
+        return True
+
+    def _prepare_image(self, src_path, width, height):
+        """Procesa para térmica B/N o, si está desactivada, solo reduce el tamaño."""
+        if getattr(self, 'thermal_bw', False):
+            return self._process_image_for_thermal(src_path, width, height)
+        return self._downscale_image(src_path, width, height)
+
     # ---------------------------------------
     # Descarga y preparación de imágenes
     # ---------------------------------------
-    def _download_image_improved(self, url, width, height, max_retries=3):
+    def _fetch_image(self, url):
+        """
+        Descarga la imagen probando variantes de la URL (ya normalizada con _clean_ml_url) y
+        devuelve la ruta del archivo local (o None si ninguna variante funcionó).
+        Se memoiza por URL con lru_cache en __init__.
+        Los reintentos por variante los maneja el Retry montado en la sesión.
+        """
+        cache_path = self._image_cache_path(url)
+        if cache_path:
+            try:
+                self.os.utime(cache_path)  # marca de uso para la purga por antigüedad
+            except OSError:
+                pass  # no está (o la borró la purga/otra instancia entretanto): se descarga de nuevo
+            else:
+                self.logger.debug("Imagen desde cache: %.50s...", url)
+                return cache_path
+
+        variants = self._try_image_variants(url)
+
+        for variant_url in variants:
+            self.logger.debug("Probando URL: %.60s...", variant_url)
+            try:
+                # Los headers (User-Agent, Referer...) ya están en la sesión
+                with self.image_downloader.get(
+                    variant_url,
+                    timeout=self.download_timeout,
+                    stream=True
+                ) as response:
+                    if response.status_code == 200:
+                        content_type = response.headers.get('content-type', '').lower()
+                        # Validar con los headers antes de leer el cuerpo (no se descarga lo que se va a descartar)
+                        declared = response.headers.get('content-length', '')
+                        declared = int(declared) if declared.isdigit() else None
+                        if 'image' not in content_type:
+                            self.logger.warning(f"No es imagen: {content_type}")
+                        elif declared is not None and declared > self.max_image_bytes:
+                            self.logger.warning(f"Imagen demasiado grande: {declared} bytes")
+                        elif (declared is not None and declared <= 1000
+                              and 'content-encoding' not in response.headers):
+                            self.logger.warning(f"Imagen muy pequeña: {declared} bytes")
+                        else:
+                            # Volcar el cuerpo por bloques directo al temporal (sin tener la imagen en memoria)
+                            size = 0
+                            with self.tempfile.NamedTemporaryFile(
+                                    delete=False, suffix='.jpg', dir=self.image_cache_dir) as tmp_jpg:
+                                try:
+                                    for chunk in response.iter_content(64 * 1024):
+                                        tmp_jpg.write(chunk)
+                                        size += len(chunk)
+                                        if size > self.max_image_bytes:
+                                            break  # sin Content-Length (o mentido): cortar igual
+                                except BaseException:
+                                    # Corte a mitad de la descarga: no dejar el archivo parcial
+                                    tmp_jpg.close()
+                                    self.os.unlink(tmp_jpg.name)
+                                    raise
+                            if size > self.max_image_bytes:
+                                self.os.unlink(tmp_jpg.name)
+                                self.logger.warning(f"Imagen demasiado grande: más de {self.max_image_bytes} bytes")
+                            elif size <= 1000:
+                                self.os.unlink(tmp_jpg.name)
+                                self.logger.warning(f"Imagen muy pequeña: {size} bytes")
+                            elif not self._is_valid_image(tmp_jpg.name):
+                                # Cuerpo truncado o que no es imagen aunque diga image/*: no entra al cache
+                                self.os.unlink(tmp_jpg.name)
+                                self.logger.warning(f"Imagen inválida o truncada: {variant_url[:50]}...")
+                            else:
+                                self.logger.info("✅ Imagen descargada: %.50s...", variant_url)
+                                if cache_path:
+                                    # Renombre atómico: el cache nunca ve un archivo a medio escribir
+                                    self.os.replace(tmp_jpg.name, cache_path)
+                                    return cache_path
+                                self._register_temp(tmp_jpg.name)
+                                return tmp_jpg.name
+                    else:
+                        self.logger.warning(f"HTTP {response.status_code}: {variant_url[:50]}...")
+            except self.requests.exceptions.Timeout:
+                self.logger.warning(f"Timeout: {variant_url[:50]}...")
+            except Exception as e:
+                self.logger.warning(f"Error descarga: {e}")
+            self.logger.debug("Falló variante: %.50s...", variant_url)
+
+        return None
+
+    def _rl_image(self, source, width, height):
+        """RLImage desde una ruta o desde bytes (un BytesIO nuevo por imagen, ReportLab lo lee al dibujar)."""
+        if isinstance(source, bytes):
+            source = self.io.BytesIO(source)
+        return self.RLImage(source, width=width, height=height, kind='proportional')
+
+    def _prepare_remote_image(self, url, width, height):
+        """Descarga la imagen y la prepara para el PDF. Devuelve ruta/bytes o None."""
+        # Clave normalizada: "-O.jpg", "-I.jpg" y ".webp" de la misma foto se descargan una sola vez
+        src_path = self._fetch_image(self._clean_ml_url(url))
+        if not src_path:
+            return None
+        return self._prepare_image(src_path, width, height)
+
+    def _download_image_improved(self, url, width, height):
         """Descarga imagen con múltiples estrategias y prepara para térmica B/N."""
         if not url:
             return self._placeholder(width, height)
@@ -1613,78 +2250,62 @@ class PDFGenerator:
         # Ruta local
         if self.os.path.exists(str(url)):
             try:
-                img_path = str(url)
-                if getattr(self, 'thermal_bw', False):
-                    img_path = self._process_image_for_thermal(img_path, width, height)
-                img = self.RLImage(img_path, width=width, height=height, kind='proportional')
+                img_path = self._prepare_image(str(url), width, height)
+                img = self._rl_image(img_path, width, height)
                 return img
             except Exception as e:
                 self.logger.warning(f"Error imagen local {url}: {e}")
                 return self._placeholder(width, height)
 
-        # Cache global
-        cache = globals().setdefault('_IMAGE_CACHE', {})
-        cache_key = f"{url}_{width}_{height}"
-        if cache_key in cache:
-            return cache[cache_key]
-
-        variants = self._try_image_variants(self._clean_ml_url(url))
+        # Ni archivo local ni URL http(s): no tiene sentido intentar descargar
+        if not RE_HTTP_URL.match(str(url).strip()):
+            self.logger.debug("Imagen sin URL válida: %.50s", url)
+            return self._placeholder(width, height)
 
-        for variant_url in variants:
-            self.logger.debug(f"Probando URL: {variant_url[:60]}...")
-            for attempt in range(max_retries):
-                try:
-                    headers = self.image_downloader.headers.copy()
-                    response = self.image_downloader.get(
-                        variant_url,
-                        headers=headers,
-                        timeout=15,
-                        stream=True
-                    )
-                    if response.status_code == 200:
-                        content_type = response.headers.get('content-type', '').lower()
-                        if 'image' in content_type:
-                            image_data = response.content
-                            if len(image_data) > 1000:
-                                # Guardar temporal original
-                                tmp_jpg = self.tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-                                tmp_jpg.write(image_data)
-                                tmp_jpg.flush()
-                                tmp_jpg.close()
-                                self._register_temp(tmp_jpg.name)
+        pending = self._pending_images.get(self._clean_ml_url(url))
+        if pending is not None:
+            img_path = pending.result()  # espera solo la imagen de este producto
+        else:
+            img_path = self._prepare_remote_image(url, width, height)
+        if not img_path:
+            self.logger.error(f"❌ No se pudo descargar imagen: {url[:50]}...")
+            return self._placeholder(width, height)
 
-                                # Procesar para térmica si corresponde
-                                img_path = tmp_jpg.name
-                                if getattr(self, 'thermal_bw', False):
-                                    img_path = self._process_image_for_thermal(tmp_jpg.name, width, height)
+        try:
+            img = self._rl_image(img_path, width, height)
+            self.logger.info("✅ Imagen preparada: %.50s...", url)
+            return img
+        except Exception as e:
+            self.logger.warning(f"Error creando RLImage: {e}")
+            self._discard_cached_image(img_path)
+            return self._placeholder(width, height)
 
-                                try:
-                                    img = self.RLImage(img_path, width=width, height=height, kind='proportional')
-                                    cache[cache_key] = img
-                                    self.logger.info(f"✅ Imagen preparada: {variant_url[:50]}...")
-                                    return img
-                                except Exception as e:
-                                    self.logger.warning(f"Error creando RLImage: {e}")
-                            else:
-                                self.logger.warning(f"Imagen muy pequeña: {len(image_data)} bytes")
-                        else:
-                            self.logger.warning(f"No es imagen: {content_type}")
-                    else:
-                        self.logger.warning(f"HTTP {response.status_code}: {variant_url[:50]}...")
-                except self.requests.exceptions.Timeout:
-                    self.logger.warning(f"Timeout intento {attempt + 1}/{max_retries}")
-                    if attempt < max_retries - 1:
-                        self.time.sleep(1)
-                except Exception as e:
-                    self.logger.warning(f"Error descarga intento {attempt + 1}: {e}")
-                    if attempt < max_retries - 1:
-                        self.time.sleep(0.5)
-                    else:
-                        break
-            self.logger.debug(f"Falló variante: {variant_url[:50]}...")
+    def _prefetch_images(self, width, height):
+        """
+        Lanza en paralelo la descarga y el procesado (B/N o reducido) de todas las imágenes
+        remotas, en el orden en que aparecen en el PDF, y devuelve el pool sin esperar.
+        Mientras tanto generate() arma los bloques: cada producto espera solo su propia
+        imagen (ver _pending_images), así la red se solapa con la construcción del story.
+        Devuelve None si no hay nada que descargar.
+        """
+        urls = []
+        for section in ('urgent', 'normal', 'to_review'):
+            for product in self.organized_products.get(section, []):
+                url = product.get('imagen', '')
+                if url and RE_HTTP_URL.match(str(url).strip()) and not self.os.path.exists(str(url)):
+                    urls.append(self._clean_ml_url(url))
+        # Una sola descarga por foto aunque aparezca en varios productos/secciones o con otra variante
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return None
 
-        self.logger.error(f"❌ No se pudo descargar imagen: {url[:50]}...")
-        return self._placeholder(width, height)
+        self.logger.info(f"📥 Descargando {len(urls)} imágenes en paralelo...")
+        # Pillow libera el GIL en el procesado, así que también se solapa entre hilos
+        pool = self.ThreadPoolExecutor(max_workers=min(self.download_workers, len(urls)))
+        self._pending_images = {
+            url: pool.submit(self._prepare_remote_image, url, width, height) for url in urls
+        }
+        return pool
 
     def _download_or_open_image(self, url, width, height):
         """Método principal para obtener imagen o placeholder."""
@@ -1694,25 +2315,16 @@ class PDFGenerator:
     # Placeholders y banners B/N
     # ---------------------------------------
     def _placeholder(self, w, h):
-        """Placeholder 100% blanco y negro (sin grises)."""
-        ph_style = self.ParagraphStyle(
-            'ph',
-            fontName=self.data_font_name,      # usar mismo font
-            fontSize=self.data_font_size,      # consistente con datos
-            alignment=self.TA_CENTER,
-            textColor=self.colors.black,
-            leading=self.data_leading
-        )
+        """
+        Placeholder 100% blanco y negro (sin grises).
+        Tabla nueva en cada llamada (los Flowables guardan estado de layout); los estilos son compartidos.
+        """
         tbl = self.Table(
-            [[self.Paragraph('<b>[Imagen no disponible]</b><br/><font size="9">Verifique conexión</font>', ph_style)]],
+            [[self.Paragraph('<b>[Imagen no disponible]</b><br/><font size="9">Verifique conexión</font>',
+                             self._placeholder_style)]],
             colWidths=[w], rowHeights=[h]
         )
-        tbl.setStyle(self.TableStyle([
-            ('BOX', (0, 0), (-1, -1), 1.2, self.colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BACKGROUND', (0, 0), (-1, -1), self.colors.white),
-        ]))
+        tbl.setStyle(self._placeholder_tbl_style)
         return tbl
 
     def _build_bw_banner(self, text, width, height_mm=9, font_size=11):
@@ -1730,15 +2342,7 @@ class PDFGenerator:
             colWidths=[width],
             rowHeights=[height_mm * self.mm]
         )
-        banner_tbl.setStyle(self.TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), self.colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING',  (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING',   (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING',(0, 0), (-1, -1), 0),
-        ]))
+        banner_tbl.setStyle(self._banner_tbl_style)
         return banner_tbl
 
     def _wrap_with_banner(self, inner_tbl, banner_text, total_width, content_pad=6):
@@ -1776,11 +2380,10 @@ class PDFGenerator:
     # ---------------------------------------
     # Construcción de un bloque de producto
     # ---------------------------------------
-    def _create_product_table(self, product, img_w, img_h, data_width, pad,
-                              is_urgent=False, is_to_review=False):
+    def _create_product_table(self, product, img_w, img_h, data_width, pad, banner_text=None):
         """
         Crea la tabla de un producto individual.
-        Para URGENTE y A REVISAR se devuelve envuelta con un banner B/N.
+        Con banner_text (URGENTE, A REVISAR) se devuelve envuelta con un banner B/N.
 
         Ajuste solicitado:
         - Si cantidad > 1: mostrar "X Unidades" en NEGRITA.
@@ -1789,38 +2392,21 @@ class PDFGenerator:
         img_el = self._download_or_open_image(product.get('imagen', ''), width=img_w, height=img_h)
 
         qty_raw = product.get('cantidad', '1')
-        try:
-            qty_int = int(self.re.findall(r'\d+', str(qty_raw))[0])
-        except Exception:
-            qty_int = 1
+        if isinstance(qty_raw, int):
+            qty_int = qty_raw
+        else:
+            m = RE_NUMBER.search(str(qty_raw))
+            qty_int = int(m.group(1)) if m else 1
 
-        # ---- Estilos de datos (20% más grandes, "peso medio" si hay Roboto-Medium) ----
-        label_style = self.ParagraphStyle(
-            'data_label',
-            fontName=self.data_font_name,
-            fontSize=self.data_font_size,
-            leading=self.data_leading,
-        )
-        value_style = self.ParagraphStyle(
-            'data_value',
-            fontName=self.data_font_name,
-            fontSize=self.data_font_size,
-            leading=self.data_leading,
-        )
+        label_style = self._label_style
+        value_style = self._value_style
 
         # Construcción del valor de Cantidad según la regla
         if qty_int == 1:
             qty_cell = self.Paragraph("1 unidad", value_style)
         else:
             # "X Unidades" en NEGRITA siempre que sea > 1
-            qty_bold_style = self.ParagraphStyle(
-                'qty_bold',
-                fontName=self.bold_font_name,            # Roboto-Bold si disponible, si no Helvetica-Bold
-                fontSize=int(round(14 * 1.2)),           # mantener énfasis de tamaño existente
-                leading=int(round(16 * 1.2)),
-                alignment=0  # Alineación izquierda para consistencia con otros valores
-            )
-            qty_cell = self.Paragraph(f"{qty_int} Unidades", qty_bold_style)
+            qty_cell = self.Paragraph(f"{qty_int} Unidades", self._qty_bold_style)
 
         datos = [
             [self.Paragraph('Precio:', label_style),
@@ -1832,52 +2418,19 @@ class PDFGenerator:
         ]
 
         data_tbl = self.Table(datos, colWidths=[75, data_width - 75])
-
-        # Estilo base
-        data_style_cmds = [
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 2),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-        ]
-
-        # Si cantidad >= 2: aplicar estilo especial para destacar
-        if qty_int >= 2:
-            data_style_cmds.extend([
-                ('ALIGN', (1, 1), (1, 1), 'LEFT'),        # Solo el valor "X Unidades" alineado a la izquierda
-                ('VALIGN', (0, 1), (1, 1), 'MIDDLE'),     # Centrar verticalmente
-                ('TOPPADDING', (0, 1), (1, 1), 4),        # Más padding superior
-                ('BOTTOMPADDING', (0, 1), (1, 1), 4),     # Más padding inferior
-            ])
-
-        data_tbl.setStyle(self.TableStyle(data_style_cmds))
+        data_tbl.setStyle(self._data_tbl_style_multi if qty_int >= 2 else self._data_tbl_style)
 
         # Tabla principal (imagen + datos) sin padding (lo maneja el wrapper)
         main_tbl = self.Table([[img_el, data_tbl]], colWidths=[50 * self.mm, data_width])
-        main_tbl.setStyle(self.TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-        ]))
+        main_tbl.setStyle(self._main_tbl_style)
 
         total_width = (50 * self.mm) + data_width
 
-        if is_urgent:
-            return self._wrap_with_banner(main_tbl, "URGENTE", total_width, content_pad=pad)
-        elif is_to_review:
-            return self._wrap_with_banner(main_tbl, "A REVISAR", total_width, content_pad=pad)
-        else:
-            # Normal: marco fino B/N
-            main_tbl.setStyle(self.TableStyle([
-                ('BOX', (0, 0), (-1, -1), 1, self.colors.black),
-                ('BACKGROUND', (0, 0), (-1, -1), self.colors.white),
-            ]))
-            return main_tbl
+        if banner_text:
+            return self._wrap_with_banner(main_tbl, banner_text, total_width, content_pad=pad)
+        # Normal: marco fino B/N
+        main_tbl.setStyle(self._normal_box_style)
+        return main_tbl
 
     # ---------------------------------------
     # Generación del documento completo
@@ -1930,16 +2483,15 @@ class PDFGenerator:
         # Header principal
         story.append(self.Paragraph("PRODUCTOS MERCADO LIBRE - ORGANIZADOS POR PRIORIDAD", title_style))
 
-        total_products = (
-            len(self.organized_products.get('urgent', [])) +
-            len(self.organized_products.get('normal', [])) +
-            len(self.organized_products.get('to_review', []))
+        sections = {key: self.organized_products.get(key, []) for key, *_ in PDF_SECTIONS}
+        total_products = sum(len(products) for products in sections.values())
+        info = (
+            f"Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M')}<br/>"
+            f"Urgentes: {len(sections['urgent'])} | "
+            f"Normales: {len(sections['normal'])} | "
+            f"A revisar: {len(sections['to_review'])}<br/>"
+            f"Total de productos: {total_products}"
         )
-        info = f"Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M')}<br/>"
-        info += f"Urgentes: {len(self.organized_products.get('urgent', []))} | "
-        info += f"Normales: {len(self.organized_products.get('normal', []))} | "
-        info += f"A revisar: {len(self.organized_products.get('to_review', []))}<br/>"
-        info += f"Total de productos: {total_products}"
 
         story.append(self.Paragraph(info, styles['Normal']))
         story.append(self.Spacer(1, 8))
@@ -1957,45 +2509,30 @@ class PDFGenerator:
         BLOCK_SPACER = 10
         PAD = 6
 
-        try:
-            # SECCIÓN 1: URGENTES
-            if self.organized_products.get('urgent'):
-                story.append(self.Paragraph("PRODUCTOS URGENTES", section_title_style))
-                story.append(self.Paragraph("(A acordar después de ayer 16:00 - Requieren atención inmediata)", styles['Normal']))
-                story.append(self.Spacer(1, 12))
-                for i, product in enumerate(self.organized_products['urgent'], 1):
-                    name = product.get('nombre') or f"Producto Urgente {i}"
-                    block_tbl = self._create_product_table(product, IMG_W, IMG_H, DATA_WIDTH, PAD, is_urgent=True)
-                    story.append(self.KeepTogether([
-                        self.Paragraph(name, prod_title_style),
-                        block_tbl,
-                        self.Spacer(1, BLOCK_SPACER)
-                    ]))
-                story.append(self.PageBreak())
+        pool = None
 
-            # SECCIÓN 2: NORMALES
-            if self.organized_products.get('normal'):
-                story.append(self.Paragraph("PRODUCTOS NORMALES", section_title_style))
-                story.append(self.Spacer(1, 12))
-                for i, product in enumerate(self.organized_products['normal'], 1):
-                    name = product.get('nombre') or f"Producto {i}"
-                    block_tbl = self._create_product_table(product, IMG_W, IMG_H, DATA_WIDTH, PAD)
-                    story.append(self.KeepTogether([
-                        self.Paragraph(name, prod_title_style),
-                        block_tbl,
-                        self.Spacer(1, BLOCK_SPACER)
-                    ]))
-                if self.organized_products.get('to_review'):
+        try:
+            # Descargar imágenes en paralelo; cada tabla de abajo espera solo la suya
+            pool = self._prefetch_images(IMG_W, IMG_H)
+
+            # Secciones: URGENTES, NORMALES, A REVISAR (salto de página entre secciones con productos)
+            first_section = True
+            for key, title, subtitle, default_name, banner_text in PDF_SECTIONS:
+                products = sections[key]
+                if not products:
+                    continue
+                if not first_section:
                     story.append(self.PageBreak())
+                first_section = False
 
-            # SECCIÓN 3: A REVISAR
-            if self.organized_products.get('to_review'):
-                story.append(self.Paragraph("RETIROS A REVISAR", section_title_style))
-                story.append(self.Paragraph("(A acordar antes de ayer 16:00 - Revisar estado con compradores)", styles['Normal']))
+                story.append(self.Paragraph(title, section_title_style))
+                if subtitle:
+                    story.append(self.Paragraph(subtitle, styles['Normal']))
                 story.append(self.Spacer(1, 12))
-                for i, product in enumerate(self.organized_products['to_review'], 1):
-                    name = product.get('nombre') or f"Producto a Revisar {i}"
-                    block_tbl = self._create_product_table(product, IMG_W, IMG_H, DATA_WIDTH, PAD, is_to_review=True)
+                for i, product in enumerate(products, 1):
+                    name = product.get('nombre') or f"{default_name} {i}"
+                    block_tbl = self._create_product_table(product, IMG_W, IMG_H, DATA_WIDTH, PAD,
+                                                           banner_text=banner_text)
                     story.append(self.KeepTogether([
                         self.Paragraph(name, prod_title_style),
                         block_tbl,
@@ -2008,6 +2545,10 @@ class PDFGenerator:
             return dest
 
         finally:
+            if pool is not None:
+                # Si algo falló a mitad de camino, no seguir descargando lo que ya no se usa
+                pool.shutdown(wait=True, cancel_futures=True)
+            self._pending_images = {}
             # Limpieza de temporales (tras terminar de construir el PDF)
             self._cleanup_temps()
 
@@ -2234,15 +2775,19 @@ class MLAutoDownloader:
 # ===================== GUI ACTUALIZADA ===================== #
 class MLExtractorGUI:
     def __init__(self, args):
+        load_gui_modules()
         self.args = args
         self.root = tk.Tk()
         self.root.title("Extractor ML Uruguay - CON FILTROS Y LÓGICA TEMPORAL")
-        self.root.geometry("700x650")
+        self.root.geometry("700x680")
         self.root.resizable(False, False)
 
         self.file_path = tk.StringVar()
         self.status_text = tk.StringVar(value="Esperando archivo...")
         self.progress_var = tk.DoubleVar()
+        # Reporte detallado (igual que --debug en CLI): método y elemento fuente de cada campo
+        self.debug_var = tk.BooleanVar(value=bool(getattr(args, 'debug', False)))
+        self._debug_enabled = self.debug_var.get()
         
 
 
@@ -2291,6 +2836,8 @@ class MLExtractorGUI:
 
         ttk.Label(lf, textvariable=self.file_path, width=50).grid(row=0, column=0, padx=(0, 10))
         ttk.Button(lf, text="Seleccionar Archivo", command=self._select_file).grid(row=0, column=1)
+        ttk.Checkbutton(lf, text="Reporte detallado (método y elemento fuente de cada campo, más lento)",
+                        variable=self.debug_var).grid(row=1, column=0, columnspan=2, sticky='w', pady=(8, 0))
         
         # Frame para descarga automática
         auto_frame = ttk.LabelFrame(main, text="Descarga Automática", padding=10)
@@ -2425,13 +2972,15 @@ class MLExtractorGUI:
 
     def _process(self):
         self.btn_process['state'] = tk.DISABLED
+        # Se lee acá (hilo de Tk); el worker usa la copia
+        self._debug_enabled = self.debug_var.get()
         self.progress.start(10)
         threading.Thread(target=self._worker).start()
 
     def _worker(self):
         try:
             self.status_text.set("Procesando archivo HTML con lógica temporal (fines de semana)...")
-            extractor = MLProductExtractor()
+            extractor = MLProductExtractor(debug_enabled=self._debug_enabled)
             
             # Configurar filtros por defecto (todos activos)
             extractor.filter_states = [
@@ -2628,12 +3177,9 @@ class MLExtractorGUI:
         
         # Abrir PDF automáticamente
         try:
-            os.startfile(pdf_path)
-        except Exception:
-            try:
-                os.system(f'open "{pdf_path}"')
-            except Exception:
-                os.system(f'xdg-open "{pdf_path}"')
+            open_file(pdf_path)
+        except Exception as e:
+            logger.warning(f"No se pudo abrir el PDF: {e}")
         
         # Cerrar el programa después de 3 segundos
         self.root.after(3000, self.root.destroy)
@@ -2675,6 +3221,7 @@ def parse_args():
     p.add_argument('--open-pdf', action='store_true', help='Abrir el PDF al terminar')
     p.add_argument('--gui', action='store_true', help='Forzar interfaz gráfica')
     p.add_argument('--no-filter', action='store_true', help='Deshabilitar todos los filtros')
+    p.add_argument('--debug', action='store_true', help='Reporte detallado: método y elemento fuente de cada campo')
     return p.parse_args()
 
 
@@ -2684,7 +3231,7 @@ def cli_flow(args):
         logger.error(f"No existe el archivo: {html_path}")
         sys.exit(1)
 
-    extractor = MLProductExtractor()
+    extractor = MLProductExtractor(debug_enabled=args.debug)
     
     # Los filtros están habilitados por defecto en CLI, salvo que se use --no-filter
     if args.no_filter:
@@ -2765,12 +3312,9 @@ def cli_flow(args):
 
     if args.open_pdf:
         try:
-            os.startfile(pdf_path)
-        except Exception:
-            try:
-                os.system(f'open "{pdf_path}"')
-            except Exception:
-                os.system(f'xdg-open "{pdf_path}"')
+            open_file(pdf_path)
+        except Exception as e:
+            logger.warning(f"No se pudo abrir el PDF: {e}")
 
     logger.info("🎉 Proceso completado con lógica temporal.")
 
@@ -2795,7 +3339,8 @@ def main():
             MLExtractorGUI(args).run()
         except Exception as e:
             logger.exception("Error fatal en GUI")
-            messagebox.showerror("Error Fatal", str(e))
+            if messagebox is not None:
+                messagebox.showerror("Error Fatal", str(e))
             sys.exit(1)
     else:
         cli_flow(args)